@@ -0,0 +1,395 @@
+"""
+JSON REST API for the calculator and projection engine.
+Plain Flask routes registered on the Dash server, so requests skip the
+Dash callback machinery entirely.
+"""
+
+import csv
+import json
+import math
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+from flask import Blueprint, Response, request, stream_with_context
+
+from backtest import backtest
+from cache import calculate_all_cached, project_retirement_cached
+from census import TRUE_VALUES, calculate_all_batch
+from constants import *
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+API_PREFIX = "/api/v1"
+MAX_BATCH_SIZE = 10_000
+STREAM_CHUNK_SIZE = 1_000
+MAX_SIMULATION_PATHS = 100_000
+
+FILING_STATUS_VALUES = [option["value"] for option in FILING_STATUSES]
+HSA_COVERAGE_VALUES = [option["value"] for option in HSA_COVERAGE_OPTIONS]
+PERIODS_VALUES = [option["value"] for option in PROJECTION_PERIODS]
+
+_REQUIRED = object()
+
+# Column dtype for each field kind in batch requests
+_DTYPES = {"int": int, "number": float, "bool": bool, "str": str}
+
+
+class ValidationError(ValueError):
+    """Request body does not match the endpoint's schema."""
+
+
+# JSON encoding: orjson when installed, otherwise the standard library
+if orjson is not None:
+    def dumps(value) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    loads = orjson.loads
+else:
+    def _default(value):
+        # numpy scalars and arrays
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def _reject_constant(name):
+        # json accepts NaN and Infinity, which are not JSON (orjson rejects them too)
+        raise ValueError(f"{name} is not valid JSON")
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+    def loads(data):
+        return json.loads(data, parse_constant=_reject_constant)
+
+
+def field(kind: str, default=_REQUIRED, minimum: float = None, maximum: float = None,
+          choices: list = None, nullable: bool = False) -> Dict:
+    """Schema entry for one request field. kind is int, number, bool or str."""
+    return {
+        "kind": kind, "default": default, "minimum": minimum, "maximum": maximum,
+        "choices": choices, "nullable": nullable
+    }
+
+
+def _checker(name: str, spec: Dict) -> Callable:
+    """Build the type/range check for one field."""
+    kind, minimum, maximum, choices = spec["kind"], spec["minimum"], spec["maximum"], spec["choices"]
+
+    def check(value):
+        if value is None and spec["nullable"]:
+            return None
+        if kind == "bool":
+            if type(value) is not bool:
+                raise ValidationError(f"{name} must be a boolean")
+            return value
+        if kind == "str":
+            if value not in choices:
+                raise ValidationError(f"{name} must be one of {', '.join(choices)}")
+            return value
+
+        # int / number; bools are ints in Python but not numbers here
+        if type(value) not in (int, float):
+            raise ValidationError(f"{name} must be a number")
+        if not math.isfinite(value):
+            raise ValidationError(f"{name} must be a finite number")
+        if kind == "int":
+            if value != int(value):
+                raise ValidationError(f"{name} must be an integer")
+            value = int(value)
+        if minimum is not None and value < minimum:
+            raise ValidationError(f"{name} must be at least {minimum}")
+        if maximum is not None and value > maximum:
+            raise ValidationError(f"{name} must be at most {maximum}")
+        if choices is not None and value not in choices:
+            raise ValidationError(f"{name} must be one of {', '.join(map(str, choices))}")
+        return value
+
+    return check
+
+
+def compile_schema(fields: Dict[str, Dict]) -> Callable[[Dict], Dict]:
+    """
+    Turn a schema into a validator, once at import time. The validator
+    returns a new dict with defaults filled in, or raises ValidationError.
+    """
+    compiled = [(name, spec["default"], _checker(name, spec)) for name, spec in fields.items()]
+    known = set(fields)
+
+    def validate(body: Dict) -> Dict:
+        if not isinstance(body, dict):
+            raise ValidationError("Request body must be a JSON object")
+        unknown = body.keys() - known
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        values = {}
+        for name, default, check in compiled:
+            value = body.get(name, default)
+            if value is _REQUIRED:
+                raise ValidationError(f"{name} is required")
+            values[name] = check(value) if value is not default else value
+        return values
+
+    return validate
+
+
+# calculate_all arguments
+CALCULATE_FIELDS = {
+    "age": field("int", minimum=0, maximum=120),
+    "salary": field("number", minimum=0),
+    "magi": field("number", minimum=0),
+    "filing_status": field("str", "single", choices=FILING_STATUS_VALUES),
+    "match_percent": field("number", 0.0, minimum=0),
+    "match_cap_percent": field("number", 0.0, minimum=0, maximum=1),
+    "match_dollar_cap": field("number", None, minimum=0, nullable=True),
+    "plan_allows_aftertax": field("bool", False),
+    "plan_allows_conversion": field("bool", False),
+    "hsa_coverage": field("str", "none", choices=HSA_COVERAGE_VALUES),
+    "total_hsa": field("number", 0.0, minimum=0),
+    "prior_year_fica": field("number", 0.0, minimum=0),
+    "backdoor_roth": field("number", 0.0, minimum=0),
+}
+
+# project_retirement arguments
+PROJECT_FIELDS = {
+    "current_age": field("int", minimum=0, maximum=120),
+    "retirement_age": field("int", minimum=0, maximum=120),
+    "current_salary": field("number", minimum=0),
+    "annual_raise_pct": field("number", DEFAULT_ANNUAL_RAISE, minimum=-1, maximum=1),
+    "existing_401k": field("number", 0.0, minimum=0),
+    "existing_ira": field("number", 0.0, minimum=0),
+    "existing_hsa": field("number", 0.0, minimum=0),
+    "match_percent": field("number", 0.0, minimum=0),
+    "match_cap_percent": field("number", 0.0, minimum=0, maximum=1),
+    "match_dollar_cap": field("number", None, minimum=0, nullable=True),
+    "plan_allows_mega": field("bool", False),
+    "hsa_coverage": field("str", "none", choices=HSA_COVERAGE_VALUES),
+    "total_hsa": field("number", 0.0, minimum=0),
+    "inflation_rate": field("number", DEFAULT_INFLATION_RATE, minimum=-1, maximum=1),
+    "magi": field("number", 0.0, minimum=0),
+    "filing_status": field("str", "single", choices=FILING_STATUS_VALUES),
+    "backdoor_roth": field("number", 0.0, minimum=0),
+    "monte_carlo_paths": field("int", 0, minimum=0, maximum=MAX_SIMULATION_PATHS),
+    "target_balance": field("number", None, minimum=0, nullable=True),
+    "seed": field("int", None, minimum=0, nullable=True),
+    "columnar": field("bool", False),
+    "periods_per_year": field("int", 1, choices=PERIODS_VALUES),
+}
+
+# backtest arguments: history supplies the returns and inflation
+BACKTEST_FIELDS = {
+    name: spec for name, spec in PROJECT_FIELDS.items()
+    if name not in ("inflation_rate", "monte_carlo_paths", "seed", "columnar")
+}
+
+validate_calculate = compile_schema(CALCULATE_FIELDS)
+validate_project = compile_schema(PROJECT_FIELDS)
+validate_backtest = compile_schema(BACKTEST_FIELDS)
+
+
+def json_response(body, status: int = 200) -> Response:
+    return Response(dumps(body), status=status, mimetype="application/json")
+
+
+def read_body():
+    """Parsed JSON request body."""
+    try:
+        return loads(request.get_data())
+    except ValueError:
+        raise ValidationError("Request body must be valid JSON")
+
+
+api = Blueprint("api", __name__, url_prefix=API_PREFIX)
+
+
+@api.errorhandler(ValidationError)
+def handle_validation_error(error):
+    return json_response({"error": str(error)}, 400)
+
+
+@api.route("/calculate", methods=["POST"])
+def calculate():
+    """2026 contribution limits for one person (calculate_all)."""
+    return json_response(calculate_all_cached(**validate_calculate(read_body())))
+
+
+@api.route("/project", methods=["POST"])
+def project():
+    """Year-by-year retirement projection (project_retirement)."""
+    projection = project_retirement_cached(**validate_project(read_body()))
+    return json_response(projection, 422 if "error" in projection else 200)
+
+
+@api.route("/backtest", methods=["POST"])
+def run_backtest():
+    """Final balance for every historical start year (backtest); target_balance is in today's dollars."""
+    inputs = validate_backtest(read_body())
+    result = backtest(inputs, inputs.pop("target_balance"))
+    return json_response(result, 422 if "error" in result else 200)
+
+
+@api.route("/calculate:batch", methods=["POST"])
+def calculate_batch():
+    """
+    calculate_all for many people at once. Takes {"records": [...]} and
+    returns columnar results: one list per result field, in record order.
+    """
+    body = read_body()
+    records = body.get("records") if isinstance(body, dict) else None
+    if not isinstance(records, list):
+        raise ValidationError("records must be a list")
+    if len(records) > MAX_BATCH_SIZE:
+        raise ValidationError(f"At most {MAX_BATCH_SIZE} records per batch")
+
+    rows = []
+    for i, record in enumerate(records):
+        try:
+            rows.append(validate_calculate(record))
+        except ValidationError as error:
+            raise ValidationError(f"records[{i}]: {error}")
+
+    results = calculate_all_batch(**records_to_columns(rows))
+    return json_response({
+        "count": len(rows),
+        "columns": {name: column.tolist() for name, column in results.items()}
+    })
+
+
+@api.route("/calculate:stream", methods=["POST"])
+def calculate_stream():
+    """
+    calculate_all over a streamed body of employee records: NDJSON (one
+    calculate request object per line) or, with Content-Type text/csv, a
+    CSV with the same column names.
+
+    Records are read and calculated STREAM_CHUNK_SIZE at a time and the
+    results streamed back as NDJSON while the upload continues, so memory
+    use does not grow with the body. Each output line is a flat result row
+    with its 1-based "record" number, or {"record": n, "error": ...} for a
+    record that failed validation.
+
+    Calculation stays in the request worker rather than a background job:
+    calculate_all_batch takes about a microsecond per record, so a
+    stream's time goes on the upload, which a gthread worker waits on in
+    one of its threads.
+    """
+    text = _body_lines(request.stream)
+    if request.mimetype == "text/csv":
+        records = (_parse_csv_record(row) for row in _csv_rows(text))
+    else:
+        records = (_parse_ndjson_record(line) for line in text if line.strip())
+
+    def generate():
+        chunk = []
+        first = 1
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == STREAM_CHUNK_SIZE:
+                yield _calculate_chunk(chunk, first)
+                first += len(chunk)
+                chunk = []
+        if chunk:
+            yield _calculate_chunk(chunk, first)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def records_to_columns(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """Validated calculate records to the column arrays calculate_all_batch takes."""
+    # A null match_dollar_cap becomes NaN, which the batch calculator reads as no cap
+    return {
+        name: np.array([row[name] for row in rows], dtype=_DTYPES[spec["kind"]])
+        for name, spec in CALCULATE_FIELDS.items()
+    }
+
+
+def _body_lines(stream) -> Iterator[str]:
+    """
+    Decoded lines of a request body. Only needs stream.readline(): under
+    gunicorn the stream is its own Body class, not an io object. The byte
+    order mark spreadsheet exports start with is dropped.
+    """
+    line = stream.readline()
+    if line.startswith(b"\xef\xbb\xbf"):
+        line = line[3:]
+    while line:
+        yield line.decode("utf-8", errors="replace")
+        line = stream.readline()
+
+
+def _parse_ndjson_record(line: str):
+    """One NDJSON line as a validated record, or the ValidationError it raised."""
+    try:
+        return validate_calculate(loads(line))
+    except ValidationError as error:
+        return error
+    except ValueError:
+        return ValidationError("Invalid JSON")
+    except Exception as error:
+        # One bad record must not end the stream
+        return ValidationError(f"Invalid record: {error}")
+
+
+def _csv_rows(text: Iterator[str]):
+    """csv.DictReader rows, with a ValidationError in place of each line the reader rejects."""
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield ValidationError(f"Invalid CSV: {error}")
+
+
+def _parse_csv_record(row: Dict[str, str]):
+    """One CSV row as a validated record, or the ValidationError it raised. Blank cells use defaults."""
+    if isinstance(row, ValidationError):
+        return row
+    record = {}
+    try:
+        for name, value in row.items():
+            # DictReader keys cells beyond the header under None
+            if name is None:
+                raise ValidationError("Too many fields")
+            if value is None or value == "":
+                continue
+            kind = CALCULATE_FIELDS[name]["kind"] if name in CALCULATE_FIELDS else None
+            if kind == "bool":
+                record[name] = value.strip().lower() in TRUE_VALUES
+            elif kind in ("int", "number"):
+                try:
+                    record[name] = float(value)
+                except ValueError:
+                    raise ValidationError(f"{name} must be a number")
+            else:
+                record[name] = value.strip()
+        return validate_calculate(record)
+    except ValidationError as error:
+        return error
+    except Exception as error:
+        # One bad record must not end the stream
+        return ValidationError(f"Invalid record: {error}")
+
+
+def _calculate_chunk(chunk: List, first: int) -> bytes:
+    """NDJSON result lines for one chunk of parsed records numbered from first, in input order."""
+    valid = [record for record in chunk if not isinstance(record, ValidationError)]
+    rows = iter(())
+    if valid:
+        results = calculate_all_batch(**records_to_columns(valid))
+        names = list(results)
+        rows = zip(*(column.tolist() for column in results.values()))
+
+    lines = []
+    for number, record in enumerate(chunk, first):
+        if isinstance(record, ValidationError):
+            body = {"record": number, "error": str(record)}
+        else:
+            body = {"record": number, **dict(zip(names, next(rows)))}
+        lines.append(dumps(body))
+    lines.append(b"")
+    return b"\n".join(lines)
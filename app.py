@@ -3,28 +3,60 @@
 Built with Dash + Plotly
 """
 
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from functools import partial
+
+# Startup timing covers the imports below. The layout needs dash and dbc, and
+# the calculation modules need numpy, so those load here; chart skeletons
+# (go.Figure and its validators) are built on first use or by warm_up, and
+# diskcache only when create_app sets up background jobs.
+_STARTED = time.perf_counter()
+
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, Input, Output, State, Patch, no_update
 import dash_bootstrap_components as dbc
+import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.utils import PlotlyJSONEncoder
 
-from calculator import calculate_all
-from projection import project_retirement, generate_headline, format_currency
+from api import api
+from cache import (
+    memoize, normalize_contribution_inputs, calculate_all_cached, project_retirement_cached, cache_stats,
+    check_caches
+)
+from executor import SimulationExecutor, use_executor
+from figures import FigureTemplate
+from metrics import CALLBACK_LATENCY, CONTENT_TYPE, instrument_requests, render_metrics, timed
+from profiling import install_profiling
+from projection import (
+    SCENARIO_RATES, project_retirement, generate_headline, format_currency,
+    simulate_balances, summarize_simulation
+)
+from sensitivity import sensitivity_grid
+from solver import schedule_from_inputs, opening_balance, solve_retirement_age, solve_extra_contribution
 from constants import *
 
-# Initialize Dash app
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[dbc.themes.DARKLY],
-    suppress_callback_exceptions=True,
-    title="2026 Retirement Calculator"
-)
+# Background jobs (Monte Carlo) run in their own processes; progress and
+# results go through a diskcache directory shared by all workers on the host
+JOB_CACHE_DIR = os.environ.get("JOB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "retirement-calculator-jobs"))
 
-server = app.server
+# Seconds spent in each startup phase, filled in by create_app
+STARTUP_TIMES = {}
+
+# Startup report and other app messages go to stderr, next to gunicorn's log
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    format="[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S %z"
+)
 
 # Custom CSS for Helvetica and dropdown fixes
-app.index_string = '''
+INDEX_STRING = '''
 <!DOCTYPE html>
 <html>
     <head>
@@ -98,287 +130,443 @@ COLORS = {
     "card": "#2c3034"
 }
 
-# Navbar
-navbar = dbc.Navbar(
-    dbc.Container([
-        dbc.NavbarBrand("2026 Retirement Calculator", className="ms-2 fs-4 fw-bold"),
-    ], fluid=True),
-    color="dark",
-    dark=True,
-    className="mb-4"
-)
 
-# Input form
-input_form = dbc.Card([
-    dbc.CardHeader(html.H5("Your Information", className="mb-0")),
-    dbc.CardBody([
-        # Personal Info Section
-        html.H6("Personal Details", className="text-muted mb-3"),
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Current Age"),
-                dbc.Input(id="input-age", type="number", value=35, min=18, max=80)
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Retirement Age"),
-                dbc.Input(id="input-retirement-age", type="number", value=65, min=50, max=80)
-            ], md=6),
-        ], className="mb-3"),
+def build_layout() -> html.Div:
+    """Page layout; built once per app by create_app."""
+    # Navbar
+    navbar = dbc.Navbar(
+        dbc.Container([
+            dbc.NavbarBrand("2026 Retirement Calculator", className="ms-2 fs-4 fw-bold"),
+        ], fluid=True),
+        color="dark",
+        dark=True,
+        className="mb-4"
+    )
 
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Annual Salary"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-salary", type="number", value=150000, min=0, step=1000)
-                ])
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Filing Status"),
-                dbc.Select(
-                    id="input-filing-status",
-                    options=[{"label": s["label"], "value": s["value"]} for s in FILING_STATUSES],
-                    value="single"
-                )
-            ], md=6),
-        ], className="mb-3"),
+    # Input form
+    input_form = dbc.Card([
+        dbc.CardHeader(html.H5("Your Information", className="mb-0")),
+        dbc.CardBody([
+            # Personal Info Section
+            html.H6("Personal Details", className="text-muted mb-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Current Age"),
+                    dbc.Input(id="input-age", type="number", value=35, min=18, max=80)
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Retirement Age"),
+                    dbc.Input(id="input-retirement-age", type="number", value=65, min=50, max=80)
+                ], md=6),
+            ], className="mb-3"),
 
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Prior-Year FICA Wages", id="fica-label"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-fica-wages", type="number", value=150000, min=0, step=1000)
-                ]),
-                dbc.Tooltip(
-                    "Your 2025 W-2 Box 3. If over $150K, catch-up must be Roth (SECURE 2.0).",
-                    target="fica-label"
-                )
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Expected Annual Raise"),
-                dbc.InputGroup([
-                    dbc.Input(id="input-raise", type="number", value=3.0, min=0, max=20, step=0.5),
-                    dbc.InputGroupText("%")
-                ])
-            ], md=6),
-        ], className="mb-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Annual Salary"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-salary", type="number", value=150000, min=0, step=1000)
+                    ])
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Filing Status"),
+                    dbc.Select(
+                        id="input-filing-status",
+                        options=[{"label": s["label"], "value": s["value"]} for s in FILING_STATUSES],
+                        value="single"
+                    )
+                ], md=6),
+            ], className="mb-3"),
 
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Expected Inflation"),
-                dbc.InputGroup([
-                    dbc.Input(id="input-inflation", type="number", value=2.5, min=0, max=10, step=0.5),
-                    dbc.InputGroupText("%")
-                ])
-            ], md=6),
-        ], className="mb-4"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Prior-Year FICA Wages", id="fica-label"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-fica-wages", type="number", value=150000, min=0, step=1000)
+                    ]),
+                    dbc.Tooltip(
+                        "Your 2025 W-2 Box 3. If over $150K, catch-up must be Roth (SECURE 2.0).",
+                        target="fica-label"
+                    )
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Expected Annual Raise"),
+                    dbc.InputGroup([
+                        dbc.Input(id="input-raise", type="number", value=3.0, min=0, max=20, step=0.5),
+                        dbc.InputGroupText("%")
+                    ])
+                ], md=6),
+            ], className="mb-3"),
 
-        html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Expected Inflation"),
+                    dbc.InputGroup([
+                        dbc.Input(id="input-inflation", type="number", value=2.5, min=0, max=10, step=0.5),
+                        dbc.InputGroupText("%")
+                    ])
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Contributions & Compounding", id="periods-label"),
+                    dbc.Select(
+                        id="input-periods",
+                        options=[
+                            {"label": option["label"], "value": str(option["value"])}
+                            for option in PROJECTION_PERIODS
+                        ],
+                        value="1"
+                    ),
+                    dbc.Tooltip(
+                        "How often contributions land and returns compound in the projection",
+                        target="periods-label"
+                    )
+                ], md=6),
+            ], className="mb-4"),
 
-        # 401(k) Section
-        html.H6("401(k) Plan Details", className="text-muted mb-3"),
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Employer Match"),
-                dbc.InputGroup([
-                    dbc.Input(id="input-match-pct", type="number", value=100, min=0, max=200, step=25),
-                    dbc.InputGroupText("%")
-                ]),
-                dbc.FormText("e.g., 100 = 100% match")
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Match Cap (% of salary)"),
-                dbc.InputGroup([
-                    dbc.Input(id="input-match-cap", type="number", value=6, min=0, max=100, step=1),
-                    dbc.InputGroupText("%")
-                ]),
-                dbc.FormText("e.g., 6 = up to 6% of salary")
-            ], md=6),
-        ], className="mb-3"),
+            html.Hr(),
 
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Match Dollar Cap", id="match-cap-label"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-match-dollar-cap", type="number", value=0, min=0, step=500)
-                ]),
-                dbc.Tooltip("Leave 0 if no dollar cap", target="match-cap-label")
-            ], md=6),
-        ], className="mb-3"),
+            # 401(k) Section
+            html.H6("401(k) Plan Details", className="text-muted mb-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Employer Match"),
+                    dbc.InputGroup([
+                        dbc.Input(id="input-match-pct", type="number", value=100, min=0, max=200, step=25),
+                        dbc.InputGroupText("%")
+                    ]),
+                    dbc.FormText("e.g., 100 = 100% match")
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Match Cap (% of salary)"),
+                    dbc.InputGroup([
+                        dbc.Input(id="input-match-cap", type="number", value=6, min=0, max=100, step=1),
+                        dbc.InputGroupText("%")
+                    ]),
+                    dbc.FormText("e.g., 6 = up to 6% of salary")
+                ], md=6),
+            ], className="mb-3"),
 
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Plan allows after-tax contributions?", id="aftertax-label"),
-                dbc.Select(
-                    id="input-allows-aftertax",
-                    options=[
-                        {"label": "Yes", "value": "yes"},
-                        {"label": "No", "value": "no"},
-                        {"label": "Not sure", "value": "notsure"},
-                    ],
-                    value="yes"
-                ),
-                dbc.Tooltip("Required for Mega Backdoor Roth", target="aftertax-label")
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Plan allows in-plan Roth conversion?", id="conversion-label"),
-                dbc.Select(
-                    id="input-allows-conversion",
-                    options=[
-                        {"label": "Yes", "value": "yes"},
-                        {"label": "No", "value": "no"},
-                        {"label": "Not sure", "value": "notsure"},
-                    ],
-                    value="yes"
-                ),
-                dbc.Tooltip("Required for Mega Backdoor Roth", target="conversion-label")
-            ], md=6),
-        ], className="mb-4"),
-
-        html.Hr(),
-
-        # HSA Section
-        html.H6("HSA Details", className="text-muted mb-3"),
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("HSA Coverage Type"),
-                dbc.Select(
-                    id="input-hsa-coverage",
-                    options=[{"label": o["label"], "value": o["value"]} for o in HSA_COVERAGE_OPTIONS],
-                    value="self"
-                )
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Total HSA Contribution (Employer + Yourself)", id="hsa-total-label"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-total-hsa", type="number", value=4400, min=0, step=100)
-                ]),
-                dbc.Tooltip("2026 max: $4,400 (self) or $8,750 (family). Add $1,000 if 55+.", target="hsa-total-label")
-            ], md=6),
-        ], className="mb-4"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Match Dollar Cap", id="match-cap-label"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-match-dollar-cap", type="number", value=0, min=0, step=500)
+                    ]),
+                    dbc.Tooltip("Leave 0 if no dollar cap", target="match-cap-label")
+                ], md=6),
+            ], className="mb-3"),
 
-        html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Plan allows after-tax contributions?", id="aftertax-label"),
+                    dbc.Select(
+                        id="input-allows-aftertax",
+                        options=[
+                            {"label": "Yes", "value": "yes"},
+                            {"label": "No", "value": "no"},
+                            {"label": "Not sure", "value": "notsure"},
+                        ],
+                        value="yes"
+                    ),
+                    dbc.Tooltip("Required for Mega Backdoor Roth", target="aftertax-label")
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Plan allows in-plan Roth conversion?", id="conversion-label"),
+                    dbc.Select(
+                        id="input-allows-conversion",
+                        options=[
+                            {"label": "Yes", "value": "yes"},
+                            {"label": "No", "value": "no"},
+                            {"label": "Not sure", "value": "notsure"},
+                        ],
+                        value="yes"
+                    ),
+                    dbc.Tooltip("Required for Mega Backdoor Roth", target="conversion-label")
+                ], md=6),
+            ], className="mb-4"),
+
+            html.Hr(),
 
-        # IRA Section
-        html.H6("IRA Details", className="text-muted mb-3"),
-        html.Div(id="backdoor-roth-section", children=[
+            # HSA Section
+            html.H6("HSA Details", className="text-muted mb-3"),
             dbc.Row([
                 dbc.Col([
-                    dbc.Label("Backdoor Roth IRA Contribution", id="backdoor-label"),
+                    dbc.Label("HSA Coverage Type"),
+                    dbc.Select(
+                        id="input-hsa-coverage",
+                        options=[{"label": o["label"], "value": o["value"]} for o in HSA_COVERAGE_OPTIONS],
+                        value="self"
+                    )
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Total HSA Contribution (Employer + Yourself)", id="hsa-total-label"),
                     dbc.InputGroup([
                         dbc.InputGroupText("$"),
-                        dbc.Input(id="input-backdoor-roth", type="number", value=0, min=0, max=8600, step=100)
+                        dbc.Input(id="input-total-hsa", type="number", value=4400, min=0, step=100)
                     ]),
-                    dbc.FormText("Only applies if your income exceeds Roth IRA limits. Max: $7,500 (+$1,100 if 50+).", className="text-muted")
+                    dbc.Tooltip("2026 max: $4,400 (self) or $8,750 (family). Add $1,000 if 55+.", target="hsa-total-label")
                 ], md=6),
             ], className="mb-4"),
-        ]),
 
-        html.Hr(),
+            html.Hr(),
 
-        # Existing Balances
-        html.H6("Existing Balances (for projection)", className="text-muted mb-3"),
-        html.P("These balances grow at the same rate as your projection (5%/7%/10% per year).", className="small text-muted mb-3"),
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Current 401(k) Balance"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-balance-401k", type="number", value=100000, min=0, step=5000)
-                ])
-            ], md=6),
-            dbc.Col([
-                dbc.Label("Current IRA Balance"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-balance-ira", type="number", value=25000, min=0, step=1000)
-                ])
-            ], md=6),
-        ], className="mb-3"),
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Current HSA Balance"),
-                dbc.InputGroup([
-                    dbc.InputGroupText("$"),
-                    dbc.Input(id="input-balance-hsa", type="number", value=10000, min=0, step=1000)
-                ])
-            ], md=6),
-        ], className="mb-3"),
+            # IRA Section
+            html.H6("IRA Details", className="text-muted mb-3"),
+            html.Div(id="backdoor-roth-section", children=[
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Backdoor Roth IRA Contribution", id="backdoor-label"),
+                        dbc.InputGroup([
+                            dbc.InputGroupText("$"),
+                            dbc.Input(id="input-backdoor-roth", type="number", value=0, min=0, max=8600, step=100)
+                        ]),
+                        dbc.FormText("Only applies if your income exceeds Roth IRA limits. Max: $7,500 (+$1,100 if 50+).", className="text-muted")
+                    ], md=6),
+                ], className="mb-4"),
+            ]),
+
+            html.Hr(),
 
-        dbc.Button("Calculate", id="btn-calculate", color="success", size="lg", className="mt-3 w-100")
+            # Existing Balances
+            html.H6("Existing Balances (for projection)", className="text-muted mb-3"),
+            html.P("These balances grow at the same rate as your projection (5%/7%/10% per year).", className="small text-muted mb-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Current 401(k) Balance"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-balance-401k", type="number", value=100000, min=0, step=5000)
+                    ])
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Current IRA Balance"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-balance-ira", type="number", value=25000, min=0, step=1000)
+                    ])
+                ], md=6),
+            ], className="mb-3"),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Current HSA Balance"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-balance-hsa", type="number", value=10000, min=0, step=1000)
+                    ])
+                ], md=6),
+            ], className="mb-3"),
+
+            dbc.Button("Calculate", id="btn-calculate", color="success", size="lg", className="mt-3 w-100")
+        ])
+    ], className="mb-4")
+
+    # Results area: stable cards whose contents are updated individually
+    results_area = html.Div(id="results-container", style={"display": "none"}, children=[
+        # Fingerprints of what the browser currently shows, so unchanged parts are skipped
+        dcc.Store(id="results-fingerprints", data={}),
+
+        # Headline projection
+        dbc.Card([
+            dbc.CardBody([
+                html.H4(id="headline-main", className="text-success text-center mb-1"),
+                html.P(id="headline-subtitle", className="text-muted text-center mb-0")
+            ])
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # Annual contribution summary
+        dbc.Card([
+            dbc.CardHeader(html.H5("2026 Tax-Advantaged Savings", className="mb-0")),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col([
+                        html.H2(id="total-yours", className="text-success"),
+                        html.P("Your Contributions", className="text-muted mb-0")
+                    ], className="text-center"),
+                    dbc.Col([
+                        html.H2(id="total-match", className="text-info"),
+                        html.P("+ Employer Match", className="text-muted mb-0")
+                    ], className="text-center"),
+                    dbc.Col([
+                        html.H2(id="total-all", className="text-warning"),
+                        html.P("= Total", className="text-muted mb-0")
+                    ], className="text-center"),
+                ], className="mb-4"),
+
+                # Contribution breakdown bar
+                dcc.Graph(id="contribution-chart", config={"displayModeBar": False}),
+
+                # Per paycheck
+                dbc.Row([
+                    dbc.Col([
+                        html.H5(id="per-paycheck", className="text-center"),
+                        html.P("Per Paycheck (biweekly)", className="text-muted text-center small")
+                    ]),
+                    dbc.Col([
+                        html.H5(id="per-month", className="text-center"),
+                        html.P("Per Month", className="text-muted text-center small")
+                    ]),
+                ], className="mt-3")
+            ])
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # 401(k) details
+        dbc.Card([
+            dbc.CardHeader(html.H5("401(k) Breakdown", className="mb-0")),
+            dbc.CardBody(id="k401-body")
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # Mega Backdoor Roth
+        dbc.Card([
+            dbc.CardHeader(html.H5("Mega Backdoor Roth", className="mb-0")),
+            dbc.CardBody(id="mega-body")
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # IRA
+        dbc.Card([
+            dbc.CardHeader(html.H5("IRA Contribution", className="mb-0")),
+            dbc.CardBody(id="ira-body")
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # HSA
+        dbc.Card([
+            dbc.CardHeader(html.H5("HSA Contribution", className="mb-0")),
+            dbc.CardBody(id="hsa-body")
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+        # Projection chart
+        dbc.Card([
+            dbc.CardHeader([
+                dbc.Row([
+                    dbc.Col(html.H5("Retirement Projection", className="mb-0")),
+                    dbc.Col([
+                        dbc.RadioItems(
+                            id="projection-toggle",
+                            options=[
+                                {"label": "Nominal $", "value": "nominal"},
+                                {"label": "Today's $", "value": "real"},
+                            ],
+                            value="nominal",
+                            inline=True,
+                            className="float-end"
+                        )
+                    ], className="text-end")
+                ])
+            ]),
+            dbc.CardBody([
+                dcc.Graph(id="projection-chart", config={"displayModeBar": False})
+            ])
+        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
     ])
-], className="mb-4")
 
-# Results area
-results_area = html.Div(id="results-container")
+    # Sensitivity heatmap, filled on Calculate
+    sensitivity_area = html.Div(id="sensitivity-container")
 
-# App layout
-app.layout = html.Div([
-    navbar,
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([input_form], lg=5),
-            dbc.Col([results_area], lg=7),
+    # Goal planner
+    goal_card = dbc.Card([
+        dbc.CardHeader(html.H5("Goal Planner", className="mb-0")),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Target Balance"),
+                    dbc.InputGroup([
+                        dbc.InputGroupText("$"),
+                        dbc.Input(id="input-goal-target", type="number", value=2000000, min=0, step=100000, debounce=True)
+                    ])
+                ], md=6),
+                dbc.Col([
+                    dbc.Label("Scenario"),
+                    dbc.Select(
+                        id="input-goal-scenario",
+                        options=[
+                            {"label": "Conservative (5%)", "value": "conservative"},
+                            {"label": "Moderate (7%)", "value": "moderate"},
+                            {"label": "Aggressive (10%)", "value": "aggressive"},
+                        ],
+                        value="moderate"
+                    )
+                ], md=6),
+            ], className="mb-3"),
+            html.Div(id="goal-results")
         ])
-    ], fluid=True, className="px-4"),
+    ], className="mb-4", style={"backgroundColor": COLORS["card"]})
 
-    # Disclaimer
-    dbc.Container([
-        html.Hr(className="mt-5"),
-        html.P(
-            "This calculator is for educational purposes only. It does not constitute tax, legal, or financial advice. "
-            "Consult a qualified tax professional or financial advisor for advice specific to your situation. "
-            "IRS limits and rules are subject to change.",
-            className="text-muted small text-center"
-        )
-    ], fluid=True, className="px-4 pb-4")
-])
+    # Monte Carlo simulation (background job with progress and cancel)
+    simulation_card = dbc.Card([
+        dbc.CardHeader(html.H5("Monte Carlo Simulation", className="mb-0")),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Paths"),
+                    dbc.Select(
+                        id="input-simulation-paths",
+                        options=[
+                            {"label": f"{paths:,}", "value": paths}
+                            for paths in (10_000, 50_000, 100_000, 250_000)
+                        ],
+                        value=DEFAULT_SIMULATION_PATHS
+                    )
+                ], md=4),
+                dbc.Col([
+                    dbc.Label("Return Volatility"),
+                    dbc.InputGroup([
+                        dbc.Input(id="input-volatility", type="number", value=DEFAULT_RETURN_VOLATILITY * 100, min=0, max=50, step=1),
+                        dbc.InputGroupText("%")
+                    ])
+                ], md=4),
+                dbc.Col([
+                    dbc.Button("Run", id="btn-simulate", color="primary", className="me-2"),
+                    dbc.Button("Cancel", id="btn-cancel-simulation", color="secondary", disabled=True)
+                ], md=4, className="d-flex align-items-end"),
+            ], className="mb-3"),
+            dbc.Progress(id="simulation-progress", value=0, className="mb-3", style={"display": "none"}),
+            html.Div(
+                html.P("Uses the Goal Planner target and scenario.", className="text-muted mb-0"),
+                id="simulation-results"
+            )
+        ])
+    ], className="mb-4", style={"backgroundColor": COLORS["card"]})
 
+    # App layout
+    return html.Div([
+        navbar,
+        dbc.Container([
+            dbc.Row([
+                dbc.Col([input_form], lg=5),
+                dbc.Col([results_area, goal_card, simulation_card, sensitivity_area], lg=7),
+            ])
+        ], fluid=True, className="px-4"),
+
+        # Disclaimer
+        dbc.Container([
+            html.Hr(className="mt-5"),
+            html.P(
+                "This calculator is for educational purposes only. It does not constitute tax, legal, or financial advice. "
+                "Consult a qualified tax professional or financial advisor for advice specific to your situation. "
+                "IRS limits and rules are subject to change.",
+                className="text-muted small text-center"
+            )
+        ], fluid=True, className="px-4 pb-4")
+    ])
 
-def create_contribution_bar_chart(results: dict) -> go.Figure:
-    """Create stacked bar chart showing contribution breakdown."""
-    totals = results["totals"]["breakdown"]
 
+def contribution_skeleton() -> go.Figure:
+    """Styling of the contribution bar chart: one bar per contribution type."""
     fig = go.Figure()
 
-    # Add each contribution type
-    categories = ["Your 401(k)", "Employer Match", "Mega Backdoor", "IRA", "HSA"]
-    values = [
-        totals["401k_deferral"],
-        totals["employer_match"],
-        totals["mega_backdoor"],
-        totals["ira"],
-        totals["hsa"]
-    ]
+    categories = ["401(k) Deferral", "Employer Match", "Mega Backdoor", "IRA", "HSA"]
     colors = [COLORS["deferral"], COLORS["match"], COLORS["mega"], COLORS["ira"], COLORS["hsa"]]
 
-    fig.add_trace(go.Bar(
-        x=values,
-        y=["Contributions"],
-        orientation="h",
-        marker_color=colors[0],
-        name="401(k) Deferral",
-        text=f"${values[0]:,.0f}",
-        textposition="inside",
-        hovertemplate="401(k) Deferral: $%{x:,.0f}<extra></extra>"
-    ))
-
-    cumulative = values[0]
-    for i, (cat, val, color) in enumerate(zip(categories[1:], values[1:], colors[1:]), 1):
-        if val > 0:
-            fig.add_trace(go.Bar(
-                x=[val],
-                y=["Contributions"],
-                orientation="h",
-                marker_color=color,
-                name=cat,
-                text=f"${val:,.0f}" if val > 2000 else "",
-                textposition="inside",
-                hovertemplate=f"{cat}: $%{{x:,.0f}}<extra></extra>"
-            ))
+    for cat, color in zip(categories, colors):
+        fig.add_trace(go.Bar(
+            y=["Contributions"],
+            orientation="h",
+            marker_color=color,
+            name=cat,
+            textposition="inside",
+            hovertemplate=f"{cat}: $%{{x:,.0f}}<extra></extra>"
+        ))
 
     fig.update_layout(
         barmode="stack",
@@ -396,60 +584,107 @@ def create_contribution_bar_chart(results: dict) -> go.Figure:
     return fig
 
 
-def create_projection_chart(projection: dict, show_real: bool = False) -> go.Figure:
-    """Create retirement projection line chart."""
+CONTRIBUTION_TEMPLATE = FigureTemplate(contribution_skeleton)
+
+
+@timed("create_contribution_bar_chart")
+def create_contribution_bar_chart(results: dict) -> dict:
+    """Create stacked bar chart showing contribution breakdown."""
+    totals = results["totals"]["breakdown"]
+    values = [
+        totals["401k_deferral"],
+        totals["employer_match"],
+        totals["mega_backdoor"],
+        totals["ira"],
+        totals["hsa"]
+    ]
+
+    # The deferral bar is always drawn, the others only when non-zero
+    traces = {0: {"x": values, "text": f"${values[0]:,.0f}"}}
+    for i, val in enumerate(values[1:], 1):
+        if val > 0:
+            traces[i] = {"x": [val], "text": f"${val:,.0f}" if val > 2000 else ""}
+
+    return CONTRIBUTION_TEMPLATE.render(traces)
+
+
+def projection_trace_data(projection: dict) -> list:
+    """
+    (x, y) arrays of every projection chart trace, in figure order: range,
+    conservative, moderate and aggressive for nominal, then the same for real.
+    """
+    # Columnar projection: one array per field per scenario
+    scenarios = projection["scenarios"]
+    years = np.asarray(projection["year"])
+
+    traces = []
+    for value_key in ("nominal", "real"):
+        cons_values = np.asarray(scenarios["conservative"][value_key])
+        mod_values = np.asarray(scenarios["moderate"][value_key])
+        agg_values = np.asarray(scenarios["aggressive"][value_key])
+        traces += [
+            (np.concatenate([years, years[::-1]]), np.concatenate([agg_values, cons_values[::-1]])),
+            (years, cons_values),
+            (years, mod_values),
+            (years, agg_values),
+        ]
+    return traces
+
+
+def projection_skeleton(show_real: bool) -> go.Figure:
+    """
+    Styling of the retirement projection line chart.
+
+    Holds both the nominal and the inflation-adjusted traces; show_real picks
+    which set starts visible and the projection toggle switches them in the
+    browser (see the clientside callback below).
+    """
     fig = go.Figure()
 
-    value_key = "real" if show_real else "nominal"
-
-    # Get data for each scenario
-    conservative = projection["scenarios"]["conservative"]
-    moderate = projection["scenarios"]["moderate"]
-    aggressive = projection["scenarios"]["aggressive"]
-
-    years = [d["year"] for d in moderate]
-    cons_values = [d[value_key] for d in conservative]
-    mod_values = [d[value_key] for d in moderate]
-    agg_values = [d[value_key] for d in aggressive]
-
-    # Shaded area between conservative and aggressive
-    fig.add_trace(go.Scatter(
-        x=years + years[::-1],
-        y=agg_values + cons_values[::-1],
-        fill="toself",
-        fillcolor="rgba(16, 185, 129, 0.1)",
-        line=dict(color="rgba(0,0,0,0)"),
-        name="Range",
-        showlegend=False,
-        hoverinfo="skip"
-    ))
-
-    # Conservative line
-    fig.add_trace(go.Scatter(
-        x=years, y=cons_values,
-        mode="lines",
-        name="Conservative (5%)",
-        line=dict(color=COLORS["conservative"], width=2, dash="dot"),
-        hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Conservative</extra>"
-    ))
-
-    # Moderate line (highlighted)
-    fig.add_trace(go.Scatter(
-        x=years, y=mod_values,
-        mode="lines",
-        name="Moderate (7%)",
-        line=dict(color=COLORS["moderate"], width=3),
-        hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Moderate</extra>"
-    ))
-
-    # Aggressive line
-    fig.add_trace(go.Scatter(
-        x=years, y=agg_values,
-        mode="lines",
-        name="Aggressive (10%)",
-        line=dict(color=COLORS["aggressive"], width=2, dash="dot"),
-        hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Aggressive</extra>"
-    ))
+    for value_key in ("nominal", "real"):
+        visible = (value_key == "real") == show_real
+
+        # Shaded area between conservative and aggressive
+        fig.add_trace(go.Scatter(
+            fill="toself",
+            fillcolor="rgba(16, 185, 129, 0.1)",
+            line=dict(color="rgba(0,0,0,0)"),
+            name="Range",
+            showlegend=False,
+            hoverinfo="skip",
+            meta=value_key,
+            visible=visible
+        ))
+
+        # Conservative line
+        fig.add_trace(go.Scatter(
+            mode="lines",
+            name="Conservative (5%)",
+            line=dict(color=COLORS["conservative"], width=2, dash="dot"),
+            hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Conservative</extra>",
+            meta=value_key,
+            visible=visible
+        ))
+
+        # Moderate line (highlighted)
+        fig.add_trace(go.Scatter(
+            mode="lines",
+            name="Moderate (7%)",
+            line=dict(color=COLORS["moderate"], width=3),
+            hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Moderate</extra>",
+            meta=value_key,
+            visible=visible
+        ))
+
+        # Aggressive line
+        fig.add_trace(go.Scatter(
+            mode="lines",
+            name="Aggressive (10%)",
+            line=dict(color=COLORS["aggressive"], width=2, dash="dot"),
+            hovertemplate="Year: %{x}<br>Balance: $%{y:,.0f}<extra>Aggressive</extra>",
+            meta=value_key,
+            visible=visible
+        ))
 
     value_label = "Today's Dollars" if show_real else "Nominal Dollars"
 
@@ -478,268 +713,705 @@ def create_projection_chart(projection: dict, show_real: bool = False) -> go.Fig
     return fig
 
 
-@callback(
-    Output("results-container", "children"),
-    Input("btn-calculate", "n_clicks"),
-    [
-        State("input-age", "value"),
-        State("input-retirement-age", "value"),
-        State("input-salary", "value"),
-        State("input-filing-status", "value"),
-        State("input-fica-wages", "value"),
-        State("input-raise", "value"),
-        State("input-inflation", "value"),
-        State("input-match-pct", "value"),
-        State("input-match-cap", "value"),
-        State("input-match-dollar-cap", "value"),
-        State("input-allows-aftertax", "value"),
-        State("input-allows-conversion", "value"),
-        State("input-hsa-coverage", "value"),
-        State("input-total-hsa", "value"),
-        State("input-backdoor-roth", "value"),
-        State("input-balance-401k", "value"),
-        State("input-balance-ira", "value"),
-        State("input-balance-hsa", "value"),
-    ],
-    prevent_initial_call=True
-)
-def update_results(
-    n_clicks, age, retirement_age, salary, filing_status, fica_wages,
-    raise_pct, inflation_pct, match_pct, match_cap, match_dollar_cap,
-    allows_aftertax, allows_conversion, hsa_coverage, total_hsa, backdoor_roth,
-    balance_401k, balance_ira, balance_hsa
-):
-    if not n_clicks:
-        return html.Div()
+PROJECTION_TEMPLATES = {show_real: FigureTemplate(partial(projection_skeleton, show_real)) for show_real in (False, True)}
 
-    # Convert string dropdown values to booleans
-    aftertax_bool = allows_aftertax == "yes"
-    conversion_bool = allows_conversion == "yes"
 
-    # Calculate annual contributions
-    results = calculate_all(
+@timed("create_projection_chart")
+def create_projection_chart(projection: dict, show_real: bool = False) -> dict:
+    """Create retirement projection line chart (see projection_skeleton)."""
+    traces = {i: {"x": x, "y": y} for i, (x, y) in enumerate(projection_trace_data(projection))}
+    return PROJECTION_TEMPLATES[show_real].render(traces)
+
+
+def sensitivity_skeleton(show_real: bool) -> go.Figure:
+    """
+    Styling of the final balance heatmap over return rate x annual raise.
+    Like the projection chart, it holds nominal and real traces for the toggle.
+    """
+    fig = go.Figure()
+
+    for value_key in ("nominal", "real"):
+        fig.add_trace(go.Heatmap(
+            colorscale="Viridis",
+            colorbar=dict(tickformat="$,.2s"),
+            hovertemplate="Return: %{x:.1f}%<br>Raise: %{y:.1f}%<br>Balance: $%{z:,.0f}<extra></extra>",
+            meta=value_key,
+            visible=(value_key == "real") == show_real
+        ))
+
+    value_label = "Today's Dollars" if show_real else "Nominal Dollars"
+
+    fig.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=40, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        title=dict(text=f"Balance at Retirement ({value_label})", font=dict(size=16)),
+        xaxis=dict(title="Annual Return (%)", ticksuffix="%"),
+        yaxis=dict(title="Annual Raise (%)", ticksuffix="%"),
+        font=dict(color="white")
+    )
+
+    return fig
+
+
+SENSITIVITY_TEMPLATES = {show_real: FigureTemplate(partial(sensitivity_skeleton, show_real)) for show_real in (False, True)}
+
+
+@timed("create_sensitivity_heatmap")
+def create_sensitivity_heatmap(grid: dict, show_real: bool = False) -> dict:
+    """Create final balance heatmap over return rate x annual raise (see sensitivity_skeleton)."""
+    returns_pct = [rate * 100 for rate in grid["return_rates"]]
+    raises_pct = [rate * 100 for rate in grid["raise_rates"]]
+    traces = {
+        i: {"x": returns_pct, "y": raises_pct, "z": grid[value_key]}
+        for i, value_key in enumerate(("nominal", "real"))
+    }
+    return SENSITIVITY_TEMPLATES[show_real].render(traces)
+
+
+# Form fields, in the order callbacks receive them
+FORM_STATES = [
+    State("input-age", "value"),
+    State("input-retirement-age", "value"),
+    State("input-salary", "value"),
+    State("input-filing-status", "value"),
+    State("input-fica-wages", "value"),
+    State("input-raise", "value"),
+    State("input-inflation", "value"),
+    State("input-match-pct", "value"),
+    State("input-match-cap", "value"),
+    State("input-match-dollar-cap", "value"),
+    State("input-allows-aftertax", "value"),
+    State("input-allows-conversion", "value"),
+    State("input-hsa-coverage", "value"),
+    State("input-total-hsa", "value"),
+    State("input-backdoor-roth", "value"),
+    State("input-balance-401k", "value"),
+    State("input-balance-ira", "value"),
+    State("input-balance-hsa", "value"),
+    State("input-periods", "value"),
+]
+
+
+def parse_form(
+    age, retirement_age, salary, filing_status, fica_wages,
+    raise_pct, inflation_pct, match_pct, match_cap, match_dollar_cap,
+    allows_aftertax, allows_conversion, hsa_coverage, total_hsa, backdoor_roth,
+    balance_401k, balance_ira, balance_hsa, periods
+) -> dict:
+    """Fill blanks with the form defaults and convert to calculation units."""
+    return dict(
         age=age or 35,
+        retirement_age=retirement_age or 65,
         salary=salary or 150000,
         magi=salary or 150000,  # Using salary as MAGI approximation
         filing_status=filing_status or "single",
+        prior_year_fica=fica_wages or 0,
+        annual_raise_pct=(raise_pct or 3) / 100,
+        inflation_rate=(inflation_pct or 2.5) / 100,
         match_percent=(match_pct or 100) / 100,
         match_cap_percent=(match_cap or 6) / 100,
         match_dollar_cap=match_dollar_cap if match_dollar_cap else None,
-        plan_allows_aftertax=aftertax_bool,
-        plan_allows_conversion=conversion_bool,
+        plan_allows_aftertax=allows_aftertax == "yes",
+        plan_allows_conversion=allows_conversion == "yes",
         hsa_coverage=hsa_coverage or "none",
         total_hsa=total_hsa or 0,
-        prior_year_fica=fica_wages or 0,
-        backdoor_roth=backdoor_roth or 0
-    )
-
-    # Calculate projection
-    projection = project_retirement(
-        current_age=age or 35,
-        retirement_age=retirement_age or 65,
-        current_salary=salary or 150000,
-        annual_raise_pct=(raise_pct or 3) / 100,
+        backdoor_roth=backdoor_roth or 0,
         existing_401k=balance_401k or 0,
         existing_ira=balance_ira or 0,
         existing_hsa=balance_hsa or 0,
-        match_percent=(match_pct or 100) / 100,
-        match_cap_percent=(match_cap or 6) / 100,
-        match_dollar_cap=match_dollar_cap if match_dollar_cap else None,
-        plan_allows_mega=aftertax_bool and conversion_bool,
-        hsa_coverage=hsa_coverage or "none",
-        total_hsa=total_hsa or 0,
-        inflation_rate=(inflation_pct or 2.5) / 100,
-        magi=salary or 150000,
-        filing_status=filing_status or "single",
-        backdoor_roth=backdoor_roth or 0
+        periods_per_year=int(periods or 1)
     )
 
-    headline = generate_headline(projection)
 
-    # Build results cards
-    return html.Div([
-        # Headline projection
-        dbc.Card([
-            dbc.CardBody([
-                html.H4(headline["main"], className="text-success text-center mb-1"),
-                html.P(headline["subtitle"], className="text-muted text-center mb-0")
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+def projection_inputs(form: dict) -> dict:
+    """Map parsed form values to project_retirement keyword arguments."""
+    return dict(
+        current_age=form["age"],
+        retirement_age=form["retirement_age"],
+        current_salary=form["salary"],
+        annual_raise_pct=form["annual_raise_pct"],
+        existing_401k=form["existing_401k"],
+        existing_ira=form["existing_ira"],
+        existing_hsa=form["existing_hsa"],
+        match_percent=form["match_percent"],
+        match_cap_percent=form["match_cap_percent"],
+        match_dollar_cap=form["match_dollar_cap"],
+        plan_allows_mega=form["plan_allows_aftertax"] and form["plan_allows_conversion"],
+        hsa_coverage=form["hsa_coverage"],
+        total_hsa=form["total_hsa"],
+        inflation_rate=form["inflation_rate"],
+        magi=form["magi"],
+        filing_status=form["filing_status"],
+        backdoor_roth=form["backdoor_roth"],
+        periods_per_year=form["periods_per_year"]
+    )
 
-        # Annual contribution summary
-        dbc.Card([
-            dbc.CardHeader(html.H5("2026 Tax-Advantaged Savings", className="mb-0")),
-            dbc.CardBody([
-                dbc.Row([
-                    dbc.Col([
-                        html.H2(f"${results['totals']['your_contributions']:,.0f}", className="text-success"),
-                        html.P("Your Contributions", className="text-muted mb-0")
-                    ], className="text-center"),
-                    dbc.Col([
-                        html.H2(f"${results['totals']['employer_match']:,.0f}", className="text-info"),
-                        html.P("+ Employer Match", className="text-muted mb-0")
-                    ], className="text-center"),
-                    dbc.Col([
-                        html.H2(f"${results['totals']['total_with_match']:,.0f}", className="text-warning"),
-                        html.P("= Total", className="text-muted mb-0")
-                    ], className="text-center"),
-                ], className="mb-4"),
 
-                # Contribution breakdown bar
-                dcc.Graph(figure=create_contribution_bar_chart(results), config={"displayModeBar": False}),
+# Individually updated parts of the results area, in callback output order
+RESULT_OUTPUTS = [
+    ("headline-main", "children"),
+    ("headline-subtitle", "children"),
+    ("total-yours", "children"),
+    ("total-match", "children"),
+    ("total-all", "children"),
+    ("contribution-chart", "figure"),
+    ("per-paycheck", "children"),
+    ("per-month", "children"),
+    ("k401-body", "children"),
+    ("mega-body", "children"),
+    ("ira-body", "children"),
+    ("hsa-body", "children"),
+]
 
-                # Per paycheck
-                dbc.Row([
-                    dbc.Col([
-                        html.H5(f"${results['per_paycheck_biweekly']:,.0f}", className="text-center"),
-                        html.P("Per Paycheck (biweekly)", className="text-muted text-center small")
-                    ]),
-                    dbc.Col([
-                        html.H5(f"${results['per_month']:,.0f}", className="text-center"),
-                        html.P("Per Month", className="text-muted text-center small")
-                    ]),
-                ], className="mt-3")
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
 
-        # 401(k) details
-        dbc.Card([
-            dbc.CardHeader(html.H5("401(k) Breakdown", className="mb-0")),
-            dbc.CardBody([
-                dbc.Row([
-                    dbc.Col([
-                        html.Div([
-                            html.Span("Base Deferral: ", className="text-muted"),
-                            html.Span(f"${results['k401']['base_deferral']:,}")
-                        ]),
-                        html.Div([
-                            html.Span("Catch-up: ", className="text-muted"),
-                            html.Span(f"${results['k401']['catchup']:,}")
-                        ]) if results['k401']['catchup'] > 0 else None,
-                        html.Div([
-                            html.Span("Your Max Deferral: ", className="text-muted"),
-                            html.Span(f"${results['k401']['your_max_deferral']:,}", className="fw-bold")
-                        ]),
-                    ]),
-                    dbc.Col([
-                        html.Div([
-                            html.Span("Employer Match: ", className="text-muted"),
-                            html.Span(f"${results['k401']['employer_match']:,.0f}")
-                        ]),
-                        html.Div([
-                            html.Span("415(c) Limit: ", className="text-muted"),
-                            html.Span(f"${results['k401']['total_415c']:,}")
-                        ]),
-                    ]),
-                ])
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+@callback(
+    [Output(component_id, prop) for component_id, prop in RESULT_OUTPUTS],
+    Output("projection-chart", "figure", allow_duplicate=True),
+    Output("results-fingerprints", "data"),
+    Output("results-container", "style"),
+    Input("btn-calculate", "n_clicks"),
+    FORM_STATES,
+    State("results-fingerprints", "data"),
+    State("projection-toggle", "value"),
+    prevent_initial_call=True
+)
+@timed("update_results", CALLBACK_LATENCY)
+def update_results(n_clicks, *args):
+    """
+    Send only the parts of the results that changed since the last response:
+    unchanged cards get no_update and the projection chart gets a Patch of
+    its trace arrays.
+    """
+    *form_values, shown, toggle_value = args
+    if not n_clicks:
+        return [no_update] * (len(RESULT_OUTPUTS) + 3)
 
-        # Mega Backdoor Roth
-        dbc.Card([
-            dbc.CardHeader(html.H5("Mega Backdoor Roth", className="mb-0")),
-            dbc.CardBody([
-                html.H3(f"${results['mega_backdoor']['room']:,}", className="text-primary") if results['mega_backdoor']['available'] else None,
-                html.P("Available after-tax contribution room", className="text-muted") if results['mega_backdoor']['available'] else None,
-                dbc.Alert(
-                    "Your plan supports Mega Backdoor Roth. You can contribute after-tax dollars and convert to Roth!",
-                    color="success"
-                ) if results['mega_backdoor']['available'] else dbc.Alert(
-                    "Your plan doesn't support Mega Backdoor Roth. Ask your HR about adding after-tax contributions and in-plan Roth conversions.",
-                    color="warning"
-                )
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+    sections = build_result_sections(**parse_form(*form_values), show_real=toggle_value == "real")
+    fingerprints = sections["fingerprints"]
+    shown = shown or {}
 
-        # IRA
-        dbc.Card([
-            dbc.CardHeader(html.H5("IRA Contribution", className="mb-0")),
-            dbc.CardBody([
-                # If income exceeds Roth IRA limit
-                html.Div([
-                    html.H3(f"${backdoor_roth or 0:,}", className="text-warning"),
-                    html.P("Backdoor Roth IRA contribution", className="text-muted"),
-                    dbc.Alert(
-                        f"You're contributing ${backdoor_roth or 0:,} via Backdoor Roth IRA. "
-                        "This involves contributing to a Traditional IRA (non-deductible) and converting to Roth.",
-                        color="success"
-                    ) if (backdoor_roth or 0) > 0 else dbc.Alert(
-                        "The IRS does not allow you to make direct Roth IRA contributions as your income exceeds the limit. "
-                        "However, you can research the Backdoor Roth IRA conversion opportunity.",
-                        color="warning"
-                    )
-                ]) if results['ira']['suggest_backdoor'] else html.Div([
-                    # If eligible for direct Roth IRA
-                    html.H3(f"${results['ira']['allowed_contribution']:,}", className="text-warning"),
-                    html.P("Maximum Roth IRA contribution", className="text-muted"),
-                    html.P(
-                        "You're eligible for direct Roth IRA contributions based on your income.",
-                        className="small text-success"
-                    )
-                ])
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+    updates = [
+        no_update if fingerprints[key] == shown.get(key) else value
+        for key, value in sections["values"].items()
+    ]
 
-        # HSA
-        dbc.Card([
-            dbc.CardHeader(html.H5("HSA Contribution", className="mb-0")),
-            dbc.CardBody([
-                html.H3(f"${results['hsa']['total_contribution']:,}", className="text-info") if results['hsa']['eligible'] else html.H3("$0"),
-                html.P(f"Total HSA contribution (max: ${results['hsa']['max_limit']:,})", className="text-muted") if results['hsa']['eligible'] else None,
-                html.P(
-                    "Triple tax advantage: tax-deductible contributions, tax-free growth, tax-free qualified withdrawals!",
-                    className="small text-muted"
-                ) if results['hsa']['eligible'] else html.P(
-                    "You must be enrolled in an HDHP to contribute to an HSA.",
-                    className="text-warning"
-                )
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+    # Projection chart: whole figure the first time, afterwards only the arrays
+    projection = sections["projection"]
+    if "error" in projection:
+        # Keep the last chart, and remember that it is still the one shown
+        chart = no_update
+        fingerprints = dict(fingerprints)
+        for key in ("projection", "projection-years"):
+            fingerprints.pop(key)
+            if key in shown:
+                fingerprints[key] = shown[key]
+    elif fingerprints["projection"] == shown.get("projection"):
+        chart = no_update
+    elif "projection" not in shown:
+        chart = sections["chart"]
+    else:
+        chart = Patch()
+        same_years = fingerprints["projection-years"] == shown.get("projection-years")
+        for i, (x, y) in enumerate(projection_trace_data(projection)):
+            if not same_years:
+                chart["data"][i]["x"] = x
+            chart["data"][i]["y"] = y
+
+    style = no_update if shown else {"display": "block"}
+    return updates + [chart, fingerprints, style]
 
-        # Projection chart
-        dbc.Card([
-            dbc.CardHeader([
-                dbc.Row([
-                    dbc.Col(html.H5("Retirement Projection", className="mb-0")),
-                    dbc.Col([
-                        dbc.RadioItems(
-                            id="projection-toggle",
-                            options=[
-                                {"label": "Nominal $", "value": "nominal"},
-                                {"label": "Today's $", "value": "real"},
-                            ],
-                            value="nominal",
-                            inline=True,
-                            className="float-end"
-                        )
-                    ], className="text-end")
-                ])
-            ]),
-            dbc.CardBody([
-                dcc.Graph(
-                    id="projection-chart",
-                    figure=create_projection_chart(projection, show_real=False),
-                    config={"displayModeBar": False}
-                ),
-                dcc.Store(id="projection-data", data=projection)
-            ])
-        ], className="mb-4", style={"backgroundColor": COLORS["card"]}),
+
+@callback(
+    Output("goal-results", "children"),
+    Input("input-goal-target", "value"),
+    Input("input-goal-scenario", "value"),
+    Input("btn-calculate", "n_clicks"),
+    FORM_STATES
+)
+@timed("update_goal", CALLBACK_LATENCY)
+def update_goal(target, scenario, n_clicks, *form_values):
+    """Goal-seek answers, recomputed live as the target changes."""
+    if not target or target <= 0:
+        return html.P("Enter a target balance.", className="text-muted mb-0")
+
+    form = parse_form(*form_values)
+    inputs = projection_inputs(form)
+    scenario = scenario or "moderate"
+
+    by_age = solve_retirement_age(inputs, target, scenario)
+    extra = solve_extra_contribution(inputs, target, scenario)
+    target_text = format_currency(target)
+
+    if "error" in by_age:
+        reach = html.P(by_age["error"], className="text-warning")
+    elif by_age["retirement_age"] is None:
+        reach = html.P(
+            f"{target_text} is not reached by age {by_age['max_retirement_age']} in this scenario.",
+            className="text-warning"
+        )
+    else:
+        reach = html.P([
+            f"You reach {target_text} at age ",
+            html.Span(f"{by_age['retirement_age']}", className="fw-bold text-success"),
+            f" ({by_age['retirement_year']})."
+        ])
+
+    if "error" in extra:
+        save = html.P(extra["error"], className="text-warning mb-0")
+    elif extra["on_track"]:
+        save = html.P(
+            f"You're on track for {target_text} by age {form['retirement_age']} "
+            f"({format_currency(extra['projected_balance'])} projected).",
+            className="text-success mb-0"
+        )
+    else:
+        save = html.P([
+            f"To have {target_text} by age {form['retirement_age']}, save an extra ",
+            html.Span(f"${extra['extra_annual']:,.0f}/yr", className="fw-bold text-warning"),
+            f" (${extra['extra_monthly']:,.0f}/mo)."
+        ], className="mb-0")
+
+    return html.Div([reach, save])
+
+
+# Simulated paths are drawn in this many batches, reporting progress after each
+SIMULATION_BATCHES = 20
+
+
+@callback(
+    Output("simulation-results", "children"),
+    Input("btn-simulate", "n_clicks"),
+    State("input-simulation-paths", "value"),
+    State("input-volatility", "value"),
+    State("input-goal-target", "value"),
+    State("input-goal-scenario", "value"),
+    FORM_STATES,
+    background=True,
+    running=[
+        (Output("btn-simulate", "disabled"), True, False),
+        (Output("btn-cancel-simulation", "disabled"), False, True),
+        (Output("simulation-progress", "style"), {"display": "flex"}, {"display": "none"}),
+    ],
+    cancel=[Input("btn-cancel-simulation", "n_clicks")],
+    progress=[Output("simulation-progress", "value"), Output("simulation-progress", "label")],
+    prevent_initial_call=True
+)
+def run_simulation(set_progress, n_clicks, paths, volatility, target, scenario, *form_values):
+    """
+    Monte Carlo projection run as a background job, outside the web
+    worker. Large runs are spread over a simulation pool; smaller ones
+    are simulated in batches in the job itself. Progress is reported as
+    tasks or batches finish, and cancelling kills the job and its pool.
+    """
+    form = parse_form(*form_values)
+    inputs = projection_inputs(form)
+    years = form["retirement_age"] - form["age"]
+    if years <= 0:
+        return dbc.Alert("Retirement age must be greater than current age", color="warning")
+
+    paths = int(paths or DEFAULT_SIMULATION_PATHS)
+    volatility = (volatility if volatility is not None else DEFAULT_RETURN_VOLATILITY * 100) / 100
+    mean_return = SCENARIO_RATES[scenario or "moderate"]
+    schedule = schedule_from_inputs(inputs, years)
+    opening = opening_balance(inputs)
+
+    target_balance = target if target and target > 0 else None
+
+    def report_progress(fraction: float) -> None:
+        percent = round(100 * fraction)
+        set_progress((percent, f"{percent}%"))
+
+    if use_executor(paths):
+        # A pool of the job's own: job processes exit without running atexit
+        # hooks, so a process-wide pool would be left behind
+        with SimulationExecutor() as executor:
+            summary = executor.simulate(
+                schedule, opening, paths, form["inflation_rate"], mean_return, volatility,
+                target_balance, periods_per_year=inputs["periods_per_year"], progress=report_progress
+            )
+    else:
+        rng = np.random.default_rng()
+        batches = []
+        for i, batch_paths in enumerate(np.diff(np.linspace(0, paths, SIMULATION_BATCHES + 1).astype(int))):
+            batches.append(simulate_balances(
+                schedule, opening, batch_paths, mean_return, volatility, rng, inputs["periods_per_year"]
+            ))
+            report_progress((i + 1) / SIMULATION_BATCHES)
+        summary = summarize_simulation(
+            np.vstack(batches), schedule, form["inflation_rate"], mean_return, volatility, target_balance
+        )
+
+    rows = [
+        html.Tr([html.Td(label), html.Td(format_currency(summary[key][-1])), html.Td(format_currency(summary[f"{key}_real"][-1]))])
+        for label, key in (("10th percentile", "p10"), ("Median", "p50"), ("90th percentile", "p90"))
+    ]
+    probability = summary["probability_of_target"]
+    return html.Div([
+        dbc.Table([
+            html.Thead(html.Tr([html.Th(f"At age {form['retirement_age']}"), html.Th("Nominal"), html.Th("Today's $")])),
+            html.Tbody(rows)
+        ], bordered=False, size="sm", className="mb-2"),
+        html.P([
+            f"Chance of reaching {format_currency(target)}: ",
+            html.Span(f"{probability:.0%}", className="fw-bold text-success")
+        ], className="mb-0") if probability is not None else None,
+        html.P(f"{summary['paths']:,} paths, {volatility:.0%} volatility.", className="text-muted small mb-0")
     ])
 
 
 @callback(
-    Output("projection-chart", "figure"),
-    Input("projection-toggle", "value"),
-    State("projection-data", "data")
+    Output("sensitivity-container", "children"),
+    Input("btn-calculate", "n_clicks"),
+    FORM_STATES,
+    prevent_initial_call=True
 )
-def update_projection_view(toggle_value, projection_data):
-    if not projection_data:
-        return go.Figure()
-    show_real = toggle_value == "real"
-    return create_projection_chart(projection_data, show_real=show_real)
+@timed("update_sensitivity", CALLBACK_LATENCY)
+def update_sensitivity(n_clicks, *form_values):
+    """
+    Return vs. raise grid. Runs in the request rather than as a background
+    job: the grid is one vectorized pass (about a millisecond cold), less
+    than starting a job process, let alone the client polling for it.
+    """
+    if not n_clicks:
+        return html.Div()
+
+    grid = sensitivity_grid(projection_inputs(parse_form(*form_values)))
+    if "error" in grid:
+        return dbc.Alert(grid["error"], color="warning")
+
+    return dbc.Card([
+        dbc.CardHeader([
+            dbc.Row([
+                dbc.Col(html.H5("Sensitivity: Return vs. Raise", className="mb-0")),
+                dbc.Col([
+                    dbc.RadioItems(
+                        id="sensitivity-toggle",
+                        options=[
+                            {"label": "Nominal $", "value": "nominal"},
+                            {"label": "Today's $", "value": "real"},
+                        ],
+                        value="nominal",
+                        inline=True,
+                        className="float-end"
+                    )
+                ], className="text-end")
+            ])
+        ]),
+        dbc.CardBody([
+            dcc.Graph(
+                id="sensitivity-chart",
+                figure=create_sensitivity_heatmap(grid, show_real=False),
+                config={"displayModeBar": False}
+            )
+        ])
+    ], className="mb-4", style={"backgroundColor": COLORS["card"]})
+
+
+def render_k401_body(results: dict) -> list:
+    """401(k) breakdown card contents."""
+    return [
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.Span("Base Deferral: ", className="text-muted"),
+                    html.Span(f"${results['k401']['base_deferral']:,}")
+                ]),
+                html.Div([
+                    html.Span("Catch-up: ", className="text-muted"),
+                    html.Span(f"${results['k401']['catchup']:,}")
+                ]) if results['k401']['catchup'] > 0 else None,
+                html.Div([
+                    html.Span("Your Max Deferral: ", className="text-muted"),
+                    html.Span(f"${results['k401']['your_max_deferral']:,}", className="fw-bold")
+                ]),
+            ]),
+            dbc.Col([
+                html.Div([
+                    html.Span("Employer Match: ", className="text-muted"),
+                    html.Span(f"${results['k401']['employer_match']:,.0f}")
+                ]),
+                html.Div([
+                    html.Span("415(c) Limit: ", className="text-muted"),
+                    html.Span(f"${results['k401']['total_415c']:,}")
+                ]),
+            ]),
+        ])
+    ]
+
+
+def render_mega_body(results: dict) -> list:
+    """Mega Backdoor Roth card contents."""
+    return [
+        html.H3(f"${results['mega_backdoor']['room']:,}", className="text-primary") if results['mega_backdoor']['available'] else None,
+        html.P("Available after-tax contribution room", className="text-muted") if results['mega_backdoor']['available'] else None,
+        dbc.Alert(
+            "Your plan supports Mega Backdoor Roth. You can contribute after-tax dollars and convert to Roth!",
+            color="success"
+        ) if results['mega_backdoor']['available'] else dbc.Alert(
+            "Your plan doesn't support Mega Backdoor Roth. Ask your HR about adding after-tax contributions and in-plan Roth conversions.",
+            color="warning"
+        )
+    ]
+
+
+def render_ira_body(results: dict, backdoor_roth: float) -> list:
+    """IRA card contents."""
+    return [
+        # If income exceeds Roth IRA limit
+        html.Div([
+            html.H3(f"${backdoor_roth:,}", className="text-warning"),
+            html.P("Backdoor Roth IRA contribution", className="text-muted"),
+            dbc.Alert(
+                f"You're contributing ${backdoor_roth:,} via Backdoor Roth IRA. "
+                "This involves contributing to a Traditional IRA (non-deductible) and converting to Roth.",
+                color="success"
+            ) if backdoor_roth > 0 else dbc.Alert(
+                "The IRS does not allow you to make direct Roth IRA contributions as your income exceeds the limit. "
+                "However, you can research the Backdoor Roth IRA conversion opportunity.",
+                color="warning"
+            )
+        ]) if results['ira']['suggest_backdoor'] else html.Div([
+            # If eligible for direct Roth IRA
+            html.H3(f"${results['ira']['allowed_contribution']:,}", className="text-warning"),
+            html.P("Maximum Roth IRA contribution", className="text-muted"),
+            html.P(
+                "You're eligible for direct Roth IRA contributions based on your income.",
+                className="small text-success"
+            )
+        ])
+    ]
+
+
+def render_hsa_body(results: dict) -> list:
+    """HSA card contents."""
+    return [
+        html.H3(f"${results['hsa']['total_contribution']:,}", className="text-info") if results['hsa']['eligible'] else html.H3("$0"),
+        html.P(f"Total HSA contribution (max: ${results['hsa']['max_limit']:,})", className="text-muted") if results['hsa']['eligible'] else None,
+        html.P(
+            "Triple tax advantage: tax-deductible contributions, tax-free growth, tax-free qualified withdrawals!",
+            className="small text-muted"
+        ) if results['hsa']['eligible'] else html.P(
+            "You must be enrolled in an HDHP to contribute to an HSA.",
+            className="text-warning"
+        )
+    ]
+
+
+def fingerprint(value) -> str:
+    """Short digest of a value's JSON form, used to detect unchanged outputs."""
+    return hashlib.sha1(json.dumps(value, cls=PlotlyJSONEncoder).encode()).hexdigest()[:16]
+
+
+@memoize("result_sections", normalize_contribution_inputs)
+def build_result_sections(
+    age, retirement_age, salary, magi, filing_status, prior_year_fica,
+    annual_raise_pct, inflation_rate, match_percent, match_cap_percent, match_dollar_cap,
+    plan_allows_aftertax, plan_allows_conversion, hsa_coverage, total_hsa, backdoor_roth,
+    existing_401k, existing_ira, existing_hsa, periods_per_year, show_real=False
+):
+    """
+    Values for every RESULT_OUTPUTS entry plus the projection, with a
+    fingerprint of each, and the full projection chart for a first render
+    (in the show_real view). Cached, so repeated inputs skip all
+    computation and figures.
+    """
+    # Calculate annual contributions
+    results = calculate_all_cached(
+        age=age,
+        salary=salary,
+        magi=magi,
+        filing_status=filing_status,
+        match_percent=match_percent,
+        match_cap_percent=match_cap_percent,
+        match_dollar_cap=match_dollar_cap,
+        plan_allows_aftertax=plan_allows_aftertax,
+        plan_allows_conversion=plan_allows_conversion,
+        hsa_coverage=hsa_coverage,
+        total_hsa=total_hsa,
+        prior_year_fica=prior_year_fica,
+        backdoor_roth=backdoor_roth
+    )
+
+    # Calculate projection
+    projection = project_retirement_cached(
+        current_age=age,
+        retirement_age=retirement_age,
+        current_salary=salary,
+        annual_raise_pct=annual_raise_pct,
+        existing_401k=existing_401k,
+        existing_ira=existing_ira,
+        existing_hsa=existing_hsa,
+        match_percent=match_percent,
+        match_cap_percent=match_cap_percent,
+        match_dollar_cap=match_dollar_cap,
+        plan_allows_mega=plan_allows_aftertax and plan_allows_conversion,
+        hsa_coverage=hsa_coverage,
+        total_hsa=total_hsa,
+        inflation_rate=inflation_rate,
+        magi=magi,
+        filing_status=filing_status,
+        backdoor_roth=backdoor_roth,
+        columnar=True,
+        periods_per_year=periods_per_year
+    )
+
+    if "error" in projection:
+        headline = {"main": projection["error"], "subtitle": ""}
+    else:
+        headline = generate_headline(projection)
+
+    values = {
+        "headline-main.children": headline["main"],
+        "headline-subtitle.children": headline["subtitle"],
+        "total-yours.children": f"${results['totals']['your_contributions']:,.0f}",
+        "total-match.children": f"${results['totals']['employer_match']:,.0f}",
+        "total-all.children": f"${results['totals']['total_with_match']:,.0f}",
+        "contribution-chart.figure": create_contribution_bar_chart(results),
+        "per-paycheck.children": f"${results['per_paycheck_biweekly']:,.0f}",
+        "per-month.children": f"${results['per_month']:,.0f}",
+        "k401-body.children": render_k401_body(results),
+        "mega-body.children": render_mega_body(results),
+        "ira-body.children": render_ira_body(results, backdoor_roth),
+        "hsa-body.children": render_hsa_body(results),
+    }
+    fingerprints = {key: fingerprint(value) for key, value in values.items()}
+    fingerprints["projection"] = fingerprint(projection)
+    fingerprints["projection-years"] = fingerprint(projection.get("year"))
+
+    chart = None if "error" in projection else create_projection_chart(projection, show_real=show_real)
+    return {"values": values, "fingerprints": fingerprints, "projection": projection, "chart": chart}
+
+
+# Nominal/real toggles run in the browser: each chart already holds both
+# trace sets (tagged via meta), so only their visibility and the title change.
+TOGGLE_DOLLARS_JS = """
+function(toggleValue, figure) {
+    if (!figure || !figure.data || !figure.data.length) {
+        return window.dash_clientside.no_update;
+    }
+    const showReal = toggleValue === "real";
+    const label = showReal ? "Today's Dollars" : "Nominal Dollars";
+    const data = figure.data.map(trace => Object.assign({}, trace, {
+        visible: (trace.meta === "real") === showReal
+    }));
+    const title = Object.assign({}, figure.layout.title, {
+        text: figure.layout.title.text.replace(/\\((Nominal|Today's) Dollars\\)/, "(" + label + ")")
+    });
+    const layout = Object.assign({}, figure.layout, {title: title});
+    return Object.assign({}, figure, {data: data, layout: layout});
+}
+"""
+
+for chart_id, toggle_id in [
+    ("projection-chart", "projection-toggle"),
+    ("sensitivity-chart", "sensitivity-toggle"),
+]:
+    dash.clientside_callback(
+        TOGGLE_DOLLARS_JS,
+        Output(chart_id, "figure"),
+        Input(toggle_id, "value"),
+        State(chart_id, "figure"),
+        prevent_initial_call=True
+    )
+
+
+def warm_up(app: dash.Dash) -> None:
+    """
+    Finish Dash's server setup, build every chart skeleton and run the
+    callbacks once with the default form so figure classes and validators
+    are loaded. Under gunicorn
+    --preload this happens once in the parent and forked workers share it
+    copy-on-write.
+    """
+    # Dash registers callbacks on its first request; doing that here also keeps
+    # concurrent first requests in a threaded worker from seeing a partial setup
+    app.server.test_client().get("/_dash-dependencies")
+
+    for template in [CONTRIBUTION_TEMPLATE, *PROJECTION_TEMPLATES.values(), *SENSITIVITY_TEMPLATES.values()]:
+        template.load()
+
+    form_values = [None] * len(FORM_STATES)
+    update_results(1, *form_values, {}, "nominal")
+    update_goal(2000000, "moderate", 1, *form_values)
+    update_sensitivity(1, *form_values)
+
+
+def create_app(warm: bool = True) -> dash.Dash:
+    """
+    Build the Dash app with its layout, API routes and instrumentation.
+    Under gunicorn --preload this and the module imports run once in the
+    master; without it every worker pays the full import time.
+    """
+    started = time.perf_counter()
+
+    # Background callback manager; imported here as it pulls in psutil and multiprocess
+    import diskcache
+    from dash import DiskcacheManager
+
+    app = dash.Dash(
+        __name__,
+        external_stylesheets=[dbc.themes.DARKLY],
+        suppress_callback_exceptions=True,
+        background_callback_manager=DiskcacheManager(diskcache.Cache(JOB_CACHE_DIR)),
+        title="2026 Retirement Calculator"
+    )
+    app.index_string = INDEX_STRING
+
+    layout_started = time.perf_counter()
+    app.layout = build_layout()
+    STARTUP_TIMES["layout"] = time.perf_counter() - layout_started
+
+    server = app.server
+    server.register_blueprint(api)
+    instrument_requests(server, cache_stats)
+    install_profiling(server)
+
+    @server.route("/metrics")
+    def serve_metrics():
+        """Prometheus scrape endpoint."""
+        return render_metrics(cache_stats(), STARTUP_TIMES), 200, {"Content-Type": CONTENT_TYPE}
+
+    @server.route("/healthz")
+    def health():
+        """Liveness: the worker is up and answering."""
+        return {"status": "ok", "pid": os.getpid()}
+
+    @server.route("/readyz")
+    def readiness():
+        """Readiness: callbacks registered, shared caches readable, job store writable."""
+        problems = {f"cache:{name}": error for name, error in check_caches().items()}
+        if not app.callback_map:
+            problems["callbacks"] = "not registered"
+        if not os.access(JOB_CACHE_DIR, os.W_OK):
+            problems["jobs"] = f"{JOB_CACHE_DIR} is not writable"
+        if problems:
+            return {"status": "unavailable", "problems": problems}, 503
+        return {"status": "ready", "pid": os.getpid(), "callbacks": len(app.callback_map)}
+
+    STARTUP_TIMES["app"] = time.perf_counter() - started
+    if warm:
+        warm_started = time.perf_counter()
+        warm_up(app)
+        STARTUP_TIMES["warm_up"] = time.perf_counter() - warm_started
+    STARTUP_TIMES["total"] = time.perf_counter() - _STARTED
+
+    server.logger.info(
+        "Startup: %s", ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in STARTUP_TIMES.items())
+    )
+    return app
+
+
+# Module-level app for `gunicorn app:server`; with --preload it is built once before forking.
+# Simulation pool processes re-import this module as __mp_main__ under
+# `python app.py` and need none of it
+STARTUP_TIMES["imports"] = time.perf_counter() - _STARTED
+if __name__ != "__mp_main__":
+    app = create_app(warm=os.environ.get("WARM_UP", "1") != "0")
+    server = app.server
 
 
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 7860))
     app.run(debug=False, host="0.0.0.0", port=port)
@@ -0,0 +1,95 @@
+"""
+Historical backtesting of the contribution schedule.
+Runs the projected contributions through every rolling window of the
+bundled historical return and inflation series.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from constants import *
+from projection import compound_balances
+from solver import opening_balance, schedule_from_inputs
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "historical_returns.csv")
+
+
+@lru_cache(maxsize=1)
+def load_history() -> Dict[str, np.ndarray]:
+    """
+    Annual stock returns and inflation as fractions, keyed by column.
+    Read from HISTORY_PATH on first use only.
+    """
+    data = np.loadtxt(HISTORY_PATH, delimiter=",", comments="#", skiprows=4)
+    return {
+        "year": data[:, 0].astype(int),
+        "stock_return": data[:, 1] / 100,
+        "inflation": data[:, 2] / 100,
+    }
+
+
+def backtest(inputs: Dict, target_balance: float = None) -> Dict:
+    """
+    Final balance at inputs["retirement_age"] for every historical start year.
+
+    Each N-year window of history supplies the returns for years 1..N of
+    the projection; real balances are deflated by that window's actual
+    inflation. Windows are strided views of the series, so all start
+    years are compounded in one array operation. Like the percentiles,
+    probability_of_target is in real terms: target_balance is in today's
+    dollars.
+    """
+    years = inputs["retirement_age"] - inputs["current_age"]
+    if years <= 0:
+        return {"error": "Retirement age must be greater than current age"}
+
+    history = load_history()
+    if years > len(history["year"]):
+        return {"error": f"History covers at most {len(history['year'])} years"}
+
+    schedule = schedule_from_inputs(inputs, years)
+    contributions = schedule["k401"] + schedule["ira"] + schedule["hsa"]
+
+    # (windows x years) views; year 0 of every window has no growth
+    returns = sliding_window_view(1 + history["stock_return"], years)
+    inflation = sliding_window_view(1 + history["inflation"], years)
+    windows = len(returns)
+    step = np.ones((windows, years + 1))
+    step[:, 1:] = returns
+    growth = np.cumprod(step, axis=1)
+
+    nominal = compound_balances(
+        opening_balance(inputs), contributions, growth, step, inputs.get("periods_per_year", 1)
+    )[:, -1]
+    real = nominal / np.prod(inflation, axis=1)
+
+    start_years = history["year"][:windows]
+    worst = int(np.argmin(real))
+    best = int(np.argmax(real))
+    probability = float(np.mean(real >= target_balance)) if target_balance is not None else None
+
+    return {
+        "windows": windows,
+        "start_year": start_years.tolist(),
+        "nominal": np.round(nominal, 0).tolist(),
+        "real": np.round(real, 0).tolist(),
+        "percentiles": {
+            f"p{p}": float(np.round(np.percentile(real, p), 0)) for p in (10, 25, 50, 75, 90)
+        },
+        "worst": {
+            "start_year": int(start_years[worst]),
+            "nominal": float(np.round(nominal[worst], 0)),
+            "real": float(np.round(real[worst], 0))
+        },
+        "best": {
+            "start_year": int(start_years[best]),
+            "nominal": float(np.round(nominal[best], 0)),
+            "real": float(np.round(real[best], 0))
+        },
+        "target_balance": target_balance,
+        "probability_of_target": probability
+    }
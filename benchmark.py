@@ -0,0 +1,344 @@
+"""
+Benchmarks for the calculator, projection, figure and callback hot paths.
+Runs every function over a fixed matrix of inputs, writes the timings and
+memory use as JSON and compares them with a stored baseline. Timings are
+the fastest of several passes with garbage collection off, the figure
+least disturbed by other load on the machine.
+
+Usage: python benchmark.py [--output results.json] [--baseline data/benchmark_baseline.json]
+                           [--tolerance 0.5] [--save-baseline]
+       python benchmark.py --scaling [--output scaling.json]
+Exits with status 1 when any benchmark is slower (or uses more memory)
+than the baseline by more than the tolerance (and, for timings, by more
+than MIN_REGRESSION_US).
+
+--scaling instead times a large Monte Carlo run serially and through
+executor.SimulationExecutor pools of 1, 2, 4, ... processes up to the
+CPU count; it is not compared with the baseline.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+import app
+from cache import CACHES
+from calculator import (
+    calculate_401k_limits, calculate_employer_match, calculate_mega_backdoor_room,
+    calculate_roth_ira_limit, calculate_hsa_limit, calculate_roth_catchup_requirement,
+    calculate_total_tax_advantaged, calculate_per_paycheck, calculate_all,
+)
+from constants import *
+from executor import SimulationExecutor, available_cpus
+from projection import generate_headline, project_retirement, simulate_returns
+from solver import opening_balance, schedule_from_inputs
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.5       # Allowed slowdown / memory growth vs. baseline (50%)
+MIN_REGRESSION_US = 1.0       # Slowdowns below this are timer noise, whatever the ratio
+ROUNDS = 15
+SCALING_PATHS = 200_000
+SCALING_ROUNDS = 3
+
+AGES = [18, 25, 35, 45, 52, 58, 61, 65, 72, 80]
+HORIZONS = [1, 5, 10, 20, 30, 45, 60]
+SALARIES = [40_000, 150_000, 400_000]
+STATUSES = [option["value"] for option in FILING_STATUSES]
+COVERAGES = [option["value"] for option in HSA_COVERAGE_OPTIONS]
+
+
+def contribution_cases() -> List[Dict]:
+    """calculate_all inputs: every age x filing status x HSA coverage, cycling salaries."""
+    cases = []
+    for i, (age, status, coverage) in enumerate(itertools.product(AGES, STATUSES, COVERAGES)):
+        salary = SALARIES[i % len(SALARIES)]
+        cases.append(dict(
+            age=age, salary=salary, magi=salary, filing_status=status,
+            match_percent=1.0, match_cap_percent=0.06, match_dollar_cap=None,
+            plan_allows_aftertax=i % 2 == 0, plan_allows_conversion=i % 2 == 0,
+            hsa_coverage=coverage, total_hsa=5_000, prior_year_fica=salary,
+            backdoor_roth=LIMIT_IRA_CONTRIBUTION
+        ))
+    return cases
+
+
+def projection_cases() -> List[Dict]:
+    """project_retirement inputs: every age x horizon (up to age 120), cycling the other inputs."""
+    cases = []
+    pairs = [(age, years) for age, years in itertools.product(AGES, HORIZONS) if age + years <= 120]
+    for i, (age, years) in enumerate(pairs):
+        salary = SALARIES[i % len(SALARIES)]
+        cases.append(dict(
+            current_age=age, retirement_age=age + years, current_salary=salary,
+            annual_raise_pct=DEFAULT_ANNUAL_RAISE, existing_401k=salary * 2,
+            existing_ira=50_000, existing_hsa=10_000, match_percent=1.0,
+            match_cap_percent=0.06, match_dollar_cap=None, plan_allows_mega=i % 2 == 0,
+            hsa_coverage=COVERAGES[i % len(COVERAGES)], total_hsa=5_000,
+            magi=salary, filing_status=STATUSES[i % len(STATUSES)],
+            backdoor_roth=LIMIT_IRA_CONTRIBUTION
+        ))
+    return cases
+
+
+def form_values(case: Dict) -> list:
+    """update_results form values (in FORM_STATES order, UI units) for a projection case."""
+    return [
+        case["current_age"], case["retirement_age"], case["current_salary"], case["filing_status"],
+        case["current_salary"], case["annual_raise_pct"] * 100, DEFAULT_INFLATION_RATE * 100,
+        case["match_percent"] * 100, case["match_cap_percent"] * 100, case["match_dollar_cap"],
+        "yes" if case["plan_allows_mega"] else "no", "yes" if case["plan_allows_mega"] else "no",
+        case["hsa_coverage"], case["total_hsa"], case["backdoor_roth"],
+        case["existing_401k"], case["existing_ira"], case["existing_hsa"], "1"
+    ]
+
+
+def clear_caches() -> None:
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def benchmarks() -> Dict[str, tuple]:
+    """name -> (function taking one case, list of cases, clear caches before each call)."""
+    contributions = contribution_cases()
+    projections = projection_cases()
+    results = [calculate_all(**case) for case in contributions]
+    finished = [project_retirement(**case) for case in projections]
+    columnar = [project_retirement(**case, columnar=True) for case in projections]
+
+    return {
+        # Calculator helpers
+        "calculate_401k_limits": (lambda c: calculate_401k_limits(c["age"]), contributions, False),
+        "calculate_employer_match": (
+            lambda c: calculate_employer_match(c["salary"], c["match_percent"], c["match_cap_percent"]),
+            contributions, False
+        ),
+        "calculate_mega_backdoor_room": (
+            lambda c: calculate_mega_backdoor_room(
+                c["age"], c["salary"], min(24_500, c["salary"]), c["salary"] * 0.06,
+                c["plan_allows_aftertax"], c["plan_allows_conversion"]
+            ),
+            contributions, False
+        ),
+        "calculate_roth_ira_limit": (
+            lambda c: calculate_roth_ira_limit(c["age"], c["magi"], c["filing_status"]), contributions, False
+        ),
+        "calculate_hsa_limit": (
+            lambda c: calculate_hsa_limit(c["age"], c["hsa_coverage"], c["total_hsa"]), contributions, False
+        ),
+        "calculate_roth_catchup_requirement": (
+            lambda c: calculate_roth_catchup_requirement(c["age"], c["prior_year_fica"]), contributions, False
+        ),
+        "calculate_total_tax_advantaged": (
+            lambda c: calculate_total_tax_advantaged(24_500, 9_000, 30_000, 7_500, 4_400), contributions, False
+        ),
+        "calculate_per_paycheck": (lambda c: calculate_per_paycheck(c["salary"] * 0.2), contributions, False),
+        "calculate_all": (lambda c: calculate_all(**c), contributions, False),
+
+        # Projection and figures
+        "project_retirement": (lambda c: project_retirement(**c), projections, False),
+        "project_retirement_columnar": (lambda c: project_retirement(**c, columnar=True), projections, False),
+        "project_retirement_biweekly": (
+            lambda c: project_retirement(**c, periods_per_year=PAY_PERIODS_BIWEEKLY), projections, False
+        ),
+        "generate_headline": (generate_headline, finished, False),
+        "create_contribution_bar_chart": (app.create_contribution_bar_chart, results, False),
+        "create_projection_chart": (app.create_projection_chart, columnar, False),
+
+        # Full callback, cold (caches cleared) and warm
+        "update_results_cold": (lambda c: app.update_results(1, *form_values(c), {}, "nominal"), projections, True),
+        "update_results_warm": (lambda c: app.update_results(1, *form_values(c), {}, "nominal"), projections, False),
+    }
+
+
+def time_pass(func: Callable, cases: List, cold: bool) -> float:
+    """Per-call time in microseconds for one pass over all cases, with garbage collection off."""
+    def run_cases():
+        for case in cases:
+            func(case)
+
+    if not cold:
+        # Refill caches a cold benchmark may have cleared; timeit turns
+        # garbage collection off while timing
+        run_cases()
+        return timeit.timeit(run_cases, number=1) / len(cases) * 1e6
+
+    # Only the calls are timed, not the cache clearing between them
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        elapsed = 0.0
+        for case in cases:
+            clear_caches()
+            start = time.perf_counter()
+            func(case)
+            elapsed += time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return elapsed / len(cases) * 1e6
+
+
+def time_benchmarks(suite: Dict[str, tuple], rounds: int = ROUNDS) -> Dict[str, Dict]:
+    """
+    Per-call timings for every benchmark; min_us is the one to compare.
+    Rounds are interleaved across benchmarks, so a burst of load on the
+    machine costs each benchmark one slow pass rather than all of them.
+    """
+    for func, cases, cold in suite.values():
+        func(cases[0])  # Warm up imports
+    per_call = {name: [] for name in suite}
+    for _ in range(rounds):
+        for name, (func, cases, cold) in suite.items():
+            per_call[name].append(time_pass(func, cases, cold))
+    return {
+        name: {
+            "calls": len(suite[name][1]) * rounds,
+            "median_us": round(float(np.median(times)), 3),
+            "min_us": round(float(np.min(times)), 3),
+            "max_us": round(float(np.max(times)), 3),
+        }
+        for name, times in per_call.items()
+    }
+
+
+def memory_benchmark(func: Callable, cases: List, cold: bool) -> Dict:
+    """Largest peak of traced allocations during one call, and bytes retained afterwards."""
+    peak = retained = 0
+    tracemalloc.start()
+    try:
+        for case in cases:
+            if cold:
+                clear_caches()
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func(case)
+            current, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+            retained = max(retained, current - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak, "retained_bytes": retained}
+
+
+# Memory is measured on the paths that allocate per call
+MEMORY_BENCHMARKS = [
+    "calculate_all", "project_retirement", "project_retirement_columnar",
+    "create_projection_chart", "update_results_cold",
+]
+
+
+def run() -> Dict:
+    suite = benchmarks()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "timings": {},
+        "memory": {},
+    }
+    report["timings"] = time_benchmarks(suite)
+    for name in suite:
+        print(f"{name:<36} {report['timings'][name]['min_us']:>12.1f} us/call", file=sys.stderr)
+    for name in MEMORY_BENCHMARKS:
+        func, cases, cold = suite[name]
+        report["memory"][name] = memory_benchmark(func, cases, cold)
+        print(f"{name:<36} {report['memory'][name]['peak_bytes'] / 1024:>12.1f} KiB peak", file=sys.stderr)
+    clear_caches()
+    return report
+
+
+def scaling() -> Dict:
+    """Seconds for a SCALING_PATHS-path simulation, serial and by pool size, with speedups."""
+    case = projection_cases()[40]
+    years = case["retirement_age"] - case["current_age"]
+    schedule = schedule_from_inputs(case, years)
+    opening = opening_balance(case)
+
+    def best(func: Callable) -> float:
+        func()  # Warm up (and start the pool's processes)
+        return min(timeit.repeat(func, repeat=SCALING_ROUNDS, number=1))
+
+    serial = best(lambda: simulate_returns(schedule, opening, paths=SCALING_PATHS, seed=1))
+    report = {"paths": SCALING_PATHS, "years": years, "cpus": available_cpus(), "serial_s": round(serial, 4), "pools": {}}
+    print(f"{'serial':<12} {serial:>8.3f} s", file=sys.stderr)
+    workers = 1
+    while workers <= available_cpus():
+        with SimulationExecutor(workers) as executor:
+            elapsed = best(lambda: executor.simulate(schedule, opening, SCALING_PATHS, seed=1))
+        report["pools"][workers] = {"seconds": round(elapsed, 4), "speedup": round(serial / elapsed, 2)}
+        print(f"{workers:>3} workers  {elapsed:>8.3f} s  {serial / elapsed:>5.2f}x", file=sys.stderr)
+        workers *= 2
+    return report
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of report against baseline beyond tolerance, as messages."""
+    regressions = []
+    for name, timing in report["timings"].items():
+        previous = baseline.get("timings", {}).get(name)
+        if not previous:
+            continue
+        delta = timing["min_us"] - previous["min_us"]
+        if delta > previous["min_us"] * tolerance and delta > MIN_REGRESSION_US:
+            regressions.append(
+                f"{name}: {timing['min_us']:.1f} us/call vs. baseline {previous['min_us']:.1f} us/call"
+            )
+    for name, memory in report["memory"].items():
+        previous = baseline.get("memory", {}).get(name)
+        if previous and memory["peak_bytes"] > previous["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {memory['peak_bytes']:,} bytes peak vs. baseline {previous['peak_bytes']:,} bytes"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark calculator, projection, figure and callback hot paths.")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed regression fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the report as the new baseline")
+    parser.add_argument("--scaling", action="store_true", help="Measure Monte Carlo speedup by pool size instead")
+    args = parser.parse_args()
+
+    if args.scaling:
+        text = json.dumps(scaling(), indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        sys.exit(0)
+
+    report = run()
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,372 @@
+"""
+Result cache for calculator and projection calls.
+Bounded LRU with optional TTL, hit/miss/eviction counters and an optional
+SQLite backend shared by every worker process on the host.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from calculator import calculate_all
+from constants import *
+from limits import LIMITS
+from metrics import timed
+from projection import ProjectionBasis, project_retirement
+
+DEFAULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 1024))
+DEFAULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", 3600))   # Seconds, 0 = never expire
+DEFAULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR")                # Unset = memory only
+
+_MISSING = object()
+
+
+class DiskStore:
+    """
+    SQLite key/value store shared across processes.
+    Keys are stored as a digest of their repr, so they must be built from
+    plain values (see make_key). Values are pickled; only point
+    RESULT_CACHE_DIR at a private directory.
+    """
+
+    def __init__(self, path: str, maxsize: int):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value BLOB, expires REAL, stored REAL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads or forked
+        # processes (gunicorn --preload); keep one per thread per process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def digest(key: Hashable) -> str:
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key: Hashable, now: float):
+        row = self._connection().execute(
+            "SELECT value, expires FROM results WHERE key = ?", (self.digest(key),)
+        ).fetchone()
+        if row is None or (row[1] and row[1] < now):
+            return _MISSING
+        return pickle.loads(row[0])
+
+    def set(self, key: Hashable, value, expires: float, now: float) -> int:
+        """Store a value and return how many old entries were evicted."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (self.digest(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires, now)
+            )
+            evicted = conn.execute(
+                "DELETE FROM results WHERE (expires > 0 AND expires < ?) OR key IN "
+                "(SELECT key FROM results ORDER BY stored DESC LIMIT -1 OFFSET ?)",
+                (now, self.maxsize)
+            ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM results")
+
+    def ping(self) -> None:
+        """Raise sqlite3.Error if the store cannot be read."""
+        self._connection().execute("SELECT 1 FROM results LIMIT 1").fetchall()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with TTL expiry and hit/miss/eviction counters.
+
+    Entries live in process memory; when directory is set they are also
+    written to a SQLite file there so other workers can reuse them.
+    Concurrent get_or_compute calls for the same missing key run compute
+    once and share its result (or exception).
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+        directory: str = DEFAULT_CACHE_DIR
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.disk = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.disk = DiskStore(os.path.join(directory, f"{name}.sqlite"), maxsize)
+
+    def get(self, key: Hashable, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if not expires or expires >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+
+        if self.disk is not None:
+            value = self.disk.get(key, now)
+            if value is not _MISSING:
+                self._store(key, value, now)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value) -> None:
+        now = time.time()
+        self._store(key, value, now)
+        if self.disk is not None:
+            evicted = self.disk.set(key, value, now + self.ttl if self.ttl else 0, now)
+            with self._lock:
+                self.evictions += evicted
+
+    def _store(self, key: Hashable, value, now: float) -> None:
+        expires = now + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        leader = False
+        with self._lock:
+            # The previous leader may have stored the value since the lookup
+            entry = self._entries.get(key)
+            if entry is not None and (not entry[0] or entry[0] >= time.time()):
+                return entry[1]
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = self._inflight[key] = Future()
+                leader = True
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+            self.set(key, value)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "shared": self.disk is not None
+            }
+
+
+# All caches created through memoize, for reporting
+CACHES: Dict[str, ResultCache] = {}
+
+
+def key_value(value):
+    """
+    Canonical form of one argument for a cache key: numbers become float
+    (150000, 150000.0 and numpy scalars are the same input), bools, strings
+    and None stay as they are. Raises TypeError for anything else, whose
+    equality and repr say nothing reliable about its state.
+    """
+    if value is None or isinstance(value, (bool, np.bool_)):
+        return None if value is None else bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value) + 0.0   # -0.0 is 0.0
+    if isinstance(value, str):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} cannot be part of a cache key")
+
+
+def make_key(arguments: Dict) -> Optional[Tuple]:
+    """
+    Cache key for a dict of normalized arguments: the sorted (name, value)
+    tuple of their canonical forms, or None if any argument has no
+    canonical form and the call cannot be cached.
+    """
+    try:
+        return tuple(sorted((name, key_value(value)) for name, value in arguments.items()))
+    except TypeError:
+        return None
+
+
+def memoize(name: str, normalize: Callable = None, bypass: Callable = None, **cache_options) -> Callable:
+    """
+    Decorator caching a function's result on its bound, normalized arguments.
+
+    normalize receives the full argument dict (defaults applied) and returns
+    it with fields that cannot affect the result collapsed to one value.
+    bypass receives the normalized arguments and returns True for calls
+    whose result must not be reused. Those calls, and calls with arguments
+    make_key cannot handle, run uncached and count as bypassed.
+    The wrapper exposes the cache as .cache.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        cache = ResultCache(name, **cache_options)
+        CACHES[name] = cache
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if normalize is not None:
+                arguments = normalize(arguments)
+            key = None if bypass is not None and bypass(arguments) else make_key(arguments)
+            if key is None:
+                with cache._lock:
+                    cache.bypassed += 1
+                return func(**arguments)
+            return cache.get_or_compute(key, lambda: func(**arguments))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """Counters for every registered cache."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+def check_caches() -> Dict[str, str]:
+    """Error message for every cache whose shared store cannot be read."""
+    errors = {}
+    for name, cache in CACHES.items():
+        if cache.disk is None:
+            continue
+        try:
+            cache.disk.ping()
+        except sqlite3.Error as error:
+            errors[name] = str(error)
+    return errors
+
+
+def normalize_contribution_inputs(arguments: Dict) -> Dict:
+    """Collapse inputs the contribution rules ignore."""
+    # Without an HDHP the HSA total is unused; otherwise only min(total, max limit) matters
+    if arguments["hsa_coverage"] == "none":
+        arguments["total_hsa"] = 0
+    else:
+        # Highest limit in any indexed year
+        max_limits = LIMITS.hsa_self_max if arguments["hsa_coverage"] == "self" else LIMITS.hsa_family_max
+        arguments["total_hsa"] = min(arguments["total_hsa"], float(max_limits[-1, -1]))
+
+    # Backdoor Roth only applies once MAGI is past the Roth IRA phase-out
+    phaseout = ROTH_PHASEOUT.get(arguments["filing_status"], ROTH_PHASEOUT["single"])
+    if arguments["magi"] < phaseout["end"]:
+        arguments["backdoor_roth"] = 0
+
+    # A zero dollar cap means no cap
+    if not arguments["match_dollar_cap"]:
+        arguments["match_dollar_cap"] = None
+    return arguments
+
+
+def normalize_projection_inputs(arguments: Dict) -> Dict:
+    """Collapse inputs project_retirement ignores."""
+    arguments = normalize_contribution_inputs(arguments)
+    # The seed only matters for Monte Carlo runs
+    if not arguments["monte_carlo_paths"]:
+        arguments["target_balance"] = None
+        arguments["seed"] = None
+    return arguments
+
+
+def is_unseeded_simulation(arguments: Dict) -> bool:
+    """Monte Carlo without a seed draws new paths on every call, so it is never cached."""
+    return bool(arguments["monte_carlo_paths"]) and arguments["seed"] is None
+
+
+# Latency is recorded for cache misses, i.e. the calculation itself
+calculate_all_cached = memoize("calculate_all", normalize_contribution_inputs)(timed("calculate_all")(calculate_all))
+projection_basis_cached = memoize("projection_basis", normalize_contribution_inputs)(ProjectionBasis)
+
+# ProjectionBasis arguments; the rest of project_retirement's only finish the projection
+_BASIS_ARGS = list(inspect.signature(ProjectionBasis).parameters)
+
+
+def _project_incrementally(**arguments) -> Dict:
+    # Reuse the schedule and growth factors of any earlier call that differed
+    # only in existing balances, inflation or Monte Carlo settings
+    if arguments["retirement_age"] <= arguments["current_age"]:
+        return project_retirement(**arguments)
+    basis = projection_basis_cached(**{name: arguments[name] for name in _BASIS_ARGS})
+    return basis.project(**{name: value for name, value in arguments.items() if name not in _BASIS_ARGS})
+
+
+_project_incrementally.__signature__ = inspect.signature(project_retirement)
+project_retirement_cached = memoize("project_retirement", normalize_projection_inputs, is_unseeded_simulation)(
+    timed("project_retirement")(_project_incrementally)
+)
@@ -2,41 +2,54 @@
 Core calculation logic for retirement contributions.
 """
 
+from typing import Dict
+
+import numpy as np
+
 from constants import *
+from limits import LIMITS
 
 
-def calculate_401k_limits(age: int) -> dict:
+def calculate_401k_limits(age: int, year: int = TAX_YEAR) -> dict:
     """
     Calculate 401(k) contribution limits based on age.
     Returns deferral limit and total 415(c) limit.
     """
+    limits = LIMITS.year_limits(year)
     if age < 50:
-        deferral = LIMIT_401K_DEFERRAL
-        total = LIMIT_401K_TOTAL_ADDITIONS
         catchup = 0
         catchup_type = None
-    elif 50 <= age <= 59:
-        deferral = LIMIT_401K_DEFERRAL + LIMIT_401K_CATCHUP_STANDARD
-        total = LIMIT_401K_TOTAL_WITH_CATCHUP
-        catchup = LIMIT_401K_CATCHUP_STANDARD
-        catchup_type = "standard"
     elif 60 <= age <= 63:
-        deferral = LIMIT_401K_DEFERRAL + LIMIT_401K_CATCHUP_SUPER
-        total = LIMIT_401K_TOTAL_WITH_SUPER
-        catchup = LIMIT_401K_CATCHUP_SUPER
+        catchup = limits["catchup_super"]
         catchup_type = "super"
-    else:  # 64+
-        deferral = LIMIT_401K_DEFERRAL + LIMIT_401K_CATCHUP_STANDARD
-        total = LIMIT_401K_TOTAL_WITH_CATCHUP
-        catchup = LIMIT_401K_CATCHUP_STANDARD
+    else:  # 50-59 and 64+
+        catchup = limits["catchup_standard"]
         catchup_type = "standard"
 
     return {
-        "base_deferral": LIMIT_401K_DEFERRAL,
+        "base_deferral": limits["base_deferral"],
         "catchup": catchup,
         "catchup_type": catchup_type,
-        "max_deferral": deferral,
-        "total_415c": total
+        "max_deferral": limits["base_deferral"] + catchup,
+        "total_415c": limits["total_additions"] + catchup
+    }
+
+
+def calculate_401k_limits_array(ages: np.ndarray, years: np.ndarray = TAX_YEAR) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_401k_limits over arrays of ages and calendar years.
+    Limits come from the indexed LIMITS table.
+    """
+    ages = np.asarray(ages)
+    year_index, age_index = LIMITS.indices(years, ages)
+    catchup_type = np.select([ages < 50, ages <= 59, ages <= 63], [None, "standard", "super"], "standard")
+
+    return {
+        "base_deferral": np.broadcast_to(LIMITS.base_deferral[year_index], ages.shape),
+        "catchup": LIMITS.catchup[year_index, age_index],
+        "catchup_type": catchup_type,
+        "max_deferral": LIMITS.max_deferral[year_index, age_index],
+        "total_415c": LIMITS.total_415c[year_index, age_index]
     }
 
 
@@ -71,12 +84,13 @@ def calculate_mega_backdoor_room(
     employee_deferral: float,
     employer_match: float,
     plan_allows_aftertax: bool,
-    plan_allows_conversion: bool
+    plan_allows_conversion: bool,
+    year: int = TAX_YEAR
 ) -> dict:
     """
     Calculate Mega Backdoor Roth contribution room.
     """
-    limits = calculate_401k_limits(age)
+    limits = calculate_401k_limits(age, year)
     total_limit = min(limits["total_415c"], salary)  # Can't exceed 100% of comp
 
     # Room for after-tax = total limit - deferrals - match
@@ -97,18 +111,19 @@ def calculate_mega_backdoor_room(
 def calculate_roth_ira_limit(
     age: int,
     magi: float,
-    filing_status: str
+    filing_status: str,
+    year: int = TAX_YEAR
 ) -> dict:
     """
     Calculate Roth IRA contribution limit with phase-out.
     """
-    base_limit = LIMIT_IRA_CONTRIBUTION
-    catchup = LIMIT_IRA_CATCHUP if age >= 50 else 0
+    limits = LIMITS.year_limits(year)
+    base_limit = limits["ira_base"]
+    catchup = limits["ira_catchup"] if age >= 50 else 0
     full_limit = base_limit + catchup
 
-    phaseout = ROTH_PHASEOUT.get(filing_status, ROTH_PHASEOUT["single"])
-    start = phaseout["start"]
-    end = phaseout["end"]
+    phaseouts = limits["roth_phaseout"]
+    start, end = phaseouts.get(filing_status, phaseouts["single"])
 
     if magi < start:
         # Full contribution allowed
@@ -141,10 +156,52 @@ def calculate_roth_ira_limit(
     }
 
 
+def calculate_roth_ira_limit_array(
+    ages: np.ndarray,
+    magi: np.ndarray,
+    filing_status: np.ndarray,
+    years: np.ndarray = TAX_YEAR
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_roth_ira_limit using the indexed LIMITS table.
+    Unknown filing statuses use the single phase-out.
+    """
+    ages = np.asarray(ages)
+    magi = np.asarray(magi, dtype=float)
+    year_index, age_index = LIMITS.indices(years, ages)
+
+    base_limit = np.broadcast_to(LIMITS.ira_base[year_index], ages.shape)
+    full_limit = LIMITS.ira_max[year_index, age_index]
+
+    phaseout = LIMITS.roth_phaseout(years, filing_status)
+    start = phaseout["start"]
+    end = phaseout["end"]
+
+    # Partial contribution (linear phase-out), rounded to nearest $10
+    partial = full_limit - full_limit * (magi - start) / (end - start)
+    partial = np.maximum(0, np.round(partial / 10) * 10)
+
+    below = magi < start
+    above = magi >= end
+    limit = np.where(below, full_limit, np.where(above, 0, partial))
+
+    return {
+        "base_limit": base_limit,
+        "catchup": full_limit - base_limit,
+        "max_limit": full_limit,
+        "allowed_contribution": limit,
+        "eligible": ~above,
+        "suggest_backdoor": above,
+        "phaseout_start": start,
+        "phaseout_end": end
+    }
+
+
 def calculate_hsa_limit(
     age: int,
     coverage_type: str,
-    total_contribution: float = 0
+    total_contribution: float = 0,
+    year: int = TAX_YEAR
 ) -> dict:
     """
     Calculate HSA contribution limit.
@@ -159,10 +216,11 @@ def calculate_hsa_limit(
             "eligible": False
         }
 
+    limits = LIMITS.year_limits(year)
     if coverage_type == "self":
-        base_limit = LIMIT_HSA_SELF
+        base_limit = limits["hsa_self"]
     else:  # family
-        base_limit = LIMIT_HSA_FAMILY
+        base_limit = limits["hsa_family"]
 
     catchup = LIMIT_HSA_CATCHUP if age >= 55 else 0
     max_limit = base_limit + catchup
@@ -179,13 +237,43 @@ def calculate_hsa_limit(
     }
 
 
+def calculate_hsa_limit_array(
+    ages: np.ndarray,
+    coverage_type: np.ndarray,
+    total_contribution: np.ndarray = 0,
+    years: np.ndarray = TAX_YEAR
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_hsa_limit using the indexed LIMITS table.
+    """
+    ages = np.asarray(ages)
+    coverage_type = np.broadcast_to(coverage_type, ages.shape)
+    year_index, age_index = LIMITS.indices(years, ages)
+
+    eligible = coverage_type != "none"
+    is_self = coverage_type == "self"
+    base_limit = np.where(is_self, LIMITS.hsa_self[year_index], LIMITS.hsa_family[year_index])
+    max_limit = np.where(is_self, LIMITS.hsa_self_max[year_index, age_index], LIMITS.hsa_family_max[year_index, age_index])
+    actual_contribution = np.minimum(total_contribution, max_limit)
+
+    return {
+        "base_limit": np.where(eligible, base_limit, 0),
+        "catchup": np.where(eligible, max_limit - base_limit, 0),
+        "max_limit": np.where(eligible, max_limit, 0),
+        "total_contribution": np.where(eligible, actual_contribution, 0),
+        "eligible": eligible
+    }
+
+
 def calculate_roth_catchup_requirement(
     age: int,
-    prior_year_fica_wages: float
+    prior_year_fica_wages: float,
+    year: int = TAX_YEAR
 ) -> dict:
     """
     Determine if SECURE 2.0 Roth catch-up rule applies.
-    If prior-year FICA wages exceed $150,000, catch-up must be Roth.
+    If prior-year FICA wages exceed the indexed threshold ($150,000 in 2026),
+    catch-up must be Roth.
     """
     if age < 50:
         return {
@@ -193,11 +281,12 @@ def calculate_roth_catchup_requirement(
             "reason": "Under age 50, no catch-up contributions"
         }
 
-    if prior_year_fica_wages > ROTH_CATCHUP_FICA_THRESHOLD:
+    threshold = LIMITS.year_limits(year)["roth_catchup_fica_threshold"]
+    if prior_year_fica_wages > threshold:
         return {
             "applies": True,
             "must_be_roth": True,
-            "reason": f"Prior-year FICA wages (${prior_year_fica_wages:,.0f}) exceed ${ROTH_CATCHUP_FICA_THRESHOLD:,}. Catch-up contributions must be Roth."
+            "reason": f"Prior-year FICA wages (${prior_year_fica_wages:,.0f}) exceed ${threshold:,}. Catch-up contributions must be Roth."
         }
     else:
         return {
@@ -207,6 +296,24 @@ def calculate_roth_catchup_requirement(
         }
 
 
+def calculate_roth_catchup_requirement_array(
+    ages: np.ndarray,
+    prior_year_fica_wages: np.ndarray,
+    years: np.ndarray = TAX_YEAR
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_roth_catchup_requirement using the indexed LIMITS table.
+    """
+    ages = np.asarray(ages)
+    threshold = LIMITS.roth_catchup_fica_threshold[LIMITS.year_index(years)]
+    applies = ages >= 50
+
+    return {
+        "applies": applies,
+        "must_be_roth": applies & (np.asarray(prior_year_fica_wages) > threshold)
+    }
+
+
 def calculate_total_tax_advantaged(
     employee_deferral: float,
     employer_match: float,
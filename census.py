@@ -0,0 +1,172 @@
+"""
+Batch contribution calculations for an employee census.
+Columnar equivalent of calculator.calculate_all, vectorized over all rows.
+"""
+
+import csv
+import sys
+from typing import Dict
+
+import numpy as np
+
+from calculator import (
+    calculate_401k_limits_array,
+    calculate_roth_ira_limit_array,
+    calculate_hsa_limit_array,
+    calculate_roth_catchup_requirement_array,
+)
+from constants import *
+
+# Census columns and how to parse them; names match calculate_all arguments
+NUMERIC_COLUMNS = [
+    "age", "salary", "magi", "match_percent", "match_cap_percent",
+    "match_dollar_cap", "total_hsa", "prior_year_fica", "backdoor_roth",
+]
+BOOLEAN_COLUMNS = ["plan_allows_aftertax", "plan_allows_conversion"]
+TEXT_COLUMNS = ["filing_status", "hsa_coverage"]
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+def calculate_all_batch(
+    age: np.ndarray,
+    salary: np.ndarray,
+    magi: np.ndarray,
+    filing_status: np.ndarray,
+    match_percent: np.ndarray,
+    match_cap_percent: np.ndarray,
+    match_dollar_cap: np.ndarray,
+    plan_allows_aftertax: np.ndarray,
+    plan_allows_conversion: np.ndarray,
+    hsa_coverage: np.ndarray,
+    total_hsa: np.ndarray,
+    prior_year_fica: np.ndarray,
+    backdoor_roth: np.ndarray = 0
+) -> Dict[str, np.ndarray]:
+    """
+    Columnar calculate_all. Every argument is an array with one entry per
+    employee (scalars broadcast). A match_dollar_cap of 0 or NaN means no cap.
+
+    Returns a flat dict of result columns named <section>_<field>, following
+    the nested keys of calculate_all.
+    """
+    age = np.asarray(age)
+    salary = np.asarray(salary, dtype=float)
+    shape = np.broadcast(age, salary).shape
+    age = np.broadcast_to(age, shape)
+    salary = np.broadcast_to(salary, shape)
+
+    # 401(k) limits
+    k401_limits = calculate_401k_limits_array(age)
+    max_deferral = np.minimum(k401_limits["max_deferral"], salary)
+
+    # Employer match
+    match_dollar_cap = np.nan_to_num(np.asarray(match_dollar_cap, dtype=float))
+    employer_match = salary * match_cap_percent * match_percent
+    employer_match = np.where(match_dollar_cap > 0, np.minimum(employer_match, match_dollar_cap), employer_match)
+
+    # Mega Backdoor
+    available = np.asarray(plan_allows_aftertax, dtype=bool) & np.asarray(plan_allows_conversion, dtype=bool)
+    total_limit = np.minimum(k401_limits["total_415c"], salary)
+    after_tax_room = np.maximum(0, total_limit - max_deferral - employer_match)
+    mega_room = np.where(available, after_tax_room, 0)
+
+    # IRA
+    ira = calculate_roth_ira_limit_array(age, magi, filing_status)
+
+    # HSA
+    hsa = calculate_hsa_limit_array(age, hsa_coverage, total_hsa)
+
+    # Roth catch-up rule
+    roth_catchup = calculate_roth_catchup_requirement_array(age, prior_year_fica)
+
+    # Determine IRA contribution: use backdoor if income too high, otherwise use direct Roth
+    ira_contribution = np.where(
+        ira["suggest_backdoor"],
+        np.minimum(backdoor_roth, ira["max_limit"]),
+        ira["allowed_contribution"]
+    )
+
+    # Totals
+    your_contributions = max_deferral + mega_room + ira_contribution + hsa["total_contribution"]
+
+    columns = {"age": age, "salary": salary}
+    columns.update({f"k401_{key}": value for key, value in k401_limits.items()})
+    columns.update({
+        "k401_your_max_deferral": max_deferral,
+        "k401_employer_match": employer_match,
+        "k401_total_401k_savings": max_deferral + employer_match + mega_room,
+        "mega_backdoor_room": mega_room,
+        "mega_backdoor_available": available,
+        "mega_backdoor_total_415c_limit": total_limit,
+    })
+    columns.update({f"ira_{key}": value for key, value in ira.items()})
+    columns["ira_contribution"] = ira_contribution
+    columns.update({f"hsa_{key}": value for key, value in hsa.items()})
+    columns.update({
+        "roth_catchup_rule_applies": roth_catchup["applies"],
+        "roth_catchup_rule_must_be_roth": roth_catchup["must_be_roth"],
+        "totals_your_contributions": your_contributions,
+        "totals_employer_match": employer_match,
+        "totals_total_with_match": your_contributions + employer_match,
+        "per_paycheck_biweekly": your_contributions / PAY_PERIODS_BIWEEKLY,
+        "per_paycheck_semimonthly": your_contributions / PAY_PERIODS_SEMIMONTHLY,
+        "per_month": your_contributions / 12,
+    })
+    return {key: np.broadcast_to(value, shape) for key, value in columns.items()}
+
+
+def _parse_columns(raw: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """Convert raw census columns to typed arrays, filling optional columns."""
+    rows = len(next(iter(raw.values()))) if raw else 0
+    columns = {}
+    for name in NUMERIC_COLUMNS:
+        values = raw.get(name, [0] * rows)
+        columns[name] = np.array([float(v) if v not in ("", None) else 0.0 for v in values])
+    for name in BOOLEAN_COLUMNS:
+        values = raw.get(name, [False] * rows)
+        columns[name] = np.array([str(v).strip().lower() in TRUE_VALUES for v in values])
+    columns["filing_status"] = np.array(raw.get("filing_status", ["single"] * rows), dtype=str)
+    columns["hsa_coverage"] = np.array(raw.get("hsa_coverage", ["none"] * rows), dtype=str)
+    return columns
+
+
+def load_census(path: str) -> Dict[str, np.ndarray]:
+    """
+    Load a census file (.csv or .parquet) into columns accepted by calculate_all_batch.
+    Missing optional columns default to zero / False / single / none.
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet census files requires pyarrow")
+        raw = pq.read_table(path).to_pydict()
+    else:
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            raw = {name: list(values) for name, values in zip(header, zip(*reader))}
+            if not raw:
+                raw = {name: [] for name in header}
+
+    return _parse_columns(raw)
+
+
+def calculate_census(path: str) -> Dict[str, np.ndarray]:
+    """Load a census file and calculate results for every employee."""
+    return calculate_all_batch(**load_census(path))
+
+
+def write_results_csv(results: Dict[str, np.ndarray], path: str) -> None:
+    """Write columnar results to a CSV file, one row per employee."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(results.keys())
+        writer.writerows(zip(*(column.tolist() for column in results.values())))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python census.py <census.csv|census.parquet> <results.csv>")
+    write_results_csv(calculate_census(sys.argv[1]), sys.argv[2])
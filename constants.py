@@ -3,6 +3,8 @@
 Source: IRS Notice 2025-67
 """
 
+TAX_YEAR = 2026
+
 # 401(k) / 403(b) / 457(b) Limits
 LIMIT_401K_DEFERRAL = 24_500              # Employee elective deferral
 LIMIT_401K_CATCHUP_STANDARD = 8_000       # Catch-up (age 50-59, 64+)
@@ -46,15 +48,29 @@ HDHP_MAX_OOP_SELF = 8_500
 HDHP_MAX_OOP_FAMILY = 17_000
 
 # Projection defaults
+LIMIT_COLA_RATE = 0.025                   # Assumed annual COLA for indexing future IRS limits
 DEFAULT_ANNUAL_RAISE = 0.03               # 3%
 DEFAULT_INFLATION_RATE = 0.025            # 2.5%
 DEFAULT_RETURN_CONSERVATIVE = 0.05        # 5%
 DEFAULT_RETURN_MODERATE = 0.07            # 7%
 DEFAULT_RETURN_AGGRESSIVE = 0.10          # 10%
 
+# Monte Carlo defaults
+DEFAULT_RETURN_VOLATILITY = 0.15          # Annual standard deviation of returns
+DEFAULT_SIMULATION_PATHS = 10_000
+
 # Pay periods
 PAY_PERIODS_BIWEEKLY = 26
 PAY_PERIODS_SEMIMONTHLY = 24
+PAY_PERIODS_MONTHLY = 12
+
+# Projection granularity: contribution installments and compounding periods per year
+PROJECTION_PERIODS = [
+    {"value": 1, "label": "Annual (contributions at start of year)"},
+    {"value": PAY_PERIODS_MONTHLY, "label": "Monthly"},
+    {"value": PAY_PERIODS_SEMIMONTHLY, "label": "Semi-monthly paychecks"},
+    {"value": PAY_PERIODS_BIWEEKLY, "label": "Bi-weekly paychecks"},
+]
 
 # Filing status options
 FILING_STATUSES = [
@@ -0,0 +1,237 @@
+"""
+Multi-core execution of projection work.
+Fans Monte Carlo paths or households out over a persistent process pool;
+workers write results straight into shared-memory arrays instead of
+returning pickled lists of dicts. projection.simulate_returns hands runs
+of PARALLEL_PATHS paths or more to get_executor().
+
+Each gunicorn worker has its own pool, so by default a pool gets that
+worker's share of the CPUs (CPUs / WEB_CONCURRENCY) rather than all of them.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from constants import *
+from projection import SCENARIO_RATES, project_retirement, simulate_balances, summarize_simulation
+
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects container CPU sets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+DEFAULT_WORKERS = (
+    int(os.environ.get("SIMULATION_WORKERS", 0))
+    or max(1, available_cpus() // int(os.environ.get("WEB_CONCURRENCY", 1)))
+)
+PATHS_PER_TASK = 5_000          # Monte Carlo paths per task
+HOUSEHOLDS_PER_TASK = 256       # Households per task
+PARALLEL_PATHS = int(os.environ.get("PARALLEL_SIMULATION_PATHS", 4 * PATHS_PER_TASK))   # 0 = never
+
+# Set in pool workers, which simulate their own paths serially
+_in_worker = False
+
+# Columns of the household result matrix
+HOUSEHOLD_COLUMNS = (
+    [f"{name}_nominal" for name in SCENARIO_RATES]
+    + [f"{name}_real" for name in SCENARIO_RATES]
+    + ["p10", "p50", "p90", "probability_of_target"]
+)
+
+
+def _create_shared(shape: Tuple[int, ...]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """New float64 shared-memory array, filled with NaN."""
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    array.fill(np.nan)
+    return shm, array
+
+
+def _attach_shared(name: str, shape: Tuple[int, ...]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Attach to an array created by _create_shared in the parent process."""
+    # Pool workers share the parent's resource tracker, so the segment stays
+    # registered once and is unlinked by the parent alone
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _mark_worker() -> None:
+    global _in_worker
+    _in_worker = True
+
+
+def use_executor(paths: int) -> bool:
+    """Whether a Monte Carlo run of this many paths goes to the process pool."""
+    return 0 < PARALLEL_PATHS <= paths and not _in_worker
+
+
+def _simulate_block(
+    name: str, shape: Tuple[int, int], start: int, stop: int,
+    schedule: Dict[str, np.ndarray], opening_balance: float,
+    mean_return: float, volatility: float, seed: np.random.SeedSequence,
+    periods_per_year: int
+) -> None:
+    """Worker: simulate paths start:stop into the shared balance matrix."""
+    shm, balances = _attach_shared(name, shape)
+    try:
+        balances[start:stop] = simulate_balances(
+            schedule, opening_balance, stop - start, mean_return, volatility,
+            np.random.default_rng(seed), periods_per_year
+        )
+    finally:
+        del balances
+        shm.close()
+
+
+def _project_block(
+    name: str, shape: Tuple[int, int], start: int, households: List[Dict],
+    monte_carlo_paths: int, seeds: List[int]
+) -> None:
+    """Worker: project households into rows start: of the shared result matrix."""
+    shm, results = _attach_shared(name, shape)
+    scenarios = len(SCENARIO_RATES)
+    try:
+        for row, (household, seed) in enumerate(zip(households, seeds), start):
+            projection = project_retirement(**household, monte_carlo_paths=monte_carlo_paths, seed=seed)
+            if "error" in projection:
+                continue
+            finals = projection["final_balances"]
+            results[row, :scenarios] = [finals[name]["nominal"] for name in SCENARIO_RATES]
+            results[row, scenarios:2 * scenarios] = [finals[name]["real"] for name in SCENARIO_RATES]
+            if monte_carlo_paths:
+                simulation = projection["monte_carlo"]
+                probability = simulation["probability_of_target"]
+                results[row, 2 * scenarios:] = [
+                    simulation["p10"][-1], simulation["p50"][-1], simulation["p90"][-1],
+                    np.nan if probability is None else probability
+                ]
+    finally:
+        del results
+        shm.close()
+
+
+class SimulationExecutor:
+    """
+    Persistent pool of worker processes for projection work.
+
+    Work is split into fixed-size tasks seeded from one SeedSequence, so
+    results depend on the seed but not on the number of workers.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = workers
+        # Callers are threaded (gthread workers, Dash jobs); forking them is
+        # unsafe, so pool processes come from a single-threaded fork server
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("forkserver"), initializer=_mark_worker
+        )
+
+    def simulate(
+        self,
+        schedule: Dict[str, np.ndarray],
+        opening_balance: float,
+        paths: int = DEFAULT_SIMULATION_PATHS,
+        inflation_rate: float = DEFAULT_INFLATION_RATE,
+        mean_return: float = DEFAULT_RETURN_MODERATE,
+        volatility: float = DEFAULT_RETURN_VOLATILITY,
+        target_balance: float = None,
+        seed: int = None,
+        periods_per_year: int = 1,
+        progress: Callable[[float], None] = None
+    ) -> Dict:
+        """
+        Parallel projection.simulate_returns: same inputs and result format.
+        progress, if given, is called with the fraction of paths simulated
+        as each task finishes.
+        """
+        shape = (paths, len(schedule["year"]))
+        shm, balances = _create_shared(shape)
+        try:
+            starts = range(0, paths, PATHS_PER_TASK)
+            seeds = np.random.SeedSequence(seed).spawn(len(starts))
+            futures = [
+                self._pool.submit(
+                    _simulate_block, shm.name, shape, start, min(start + PATHS_PER_TASK, paths),
+                    schedule, opening_balance, mean_return, volatility, task_seed, periods_per_year
+                )
+                for start, task_seed in zip(starts, seeds)
+            ]
+            done = 0
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if progress is not None:
+                    progress(done / len(futures))
+            return summarize_simulation(balances, schedule, inflation_rate, mean_return, volatility, target_balance)
+        finally:
+            del balances
+            shm.close()
+            shm.unlink()
+
+    def project_households(
+        self,
+        households: List[Dict],
+        monte_carlo_paths: int = 0,
+        seed: int = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        project_retirement for every household (a dict of its keyword
+        arguments other than monte_carlo_paths and seed). Returns one
+        array per HOUSEHOLD_COLUMNS entry with a row per household: final
+        balance by scenario and, with Monte Carlo paths, the final
+        p10/p50/p90 and probability of target_balance. Households whose
+        projection fails are NaN.
+        """
+        shape = (len(households), len(HOUSEHOLD_COLUMNS))
+        shm, results = _create_shared(shape)
+        try:
+            seeds = np.random.SeedSequence(seed).generate_state(len(households)).tolist()
+            futures = [
+                self._pool.submit(
+                    _project_block, shm.name, shape, start,
+                    households[start:start + HOUSEHOLDS_PER_TASK], monte_carlo_paths,
+                    seeds[start:start + HOUSEHOLDS_PER_TASK]
+                )
+                for start in range(0, len(households), HOUSEHOLDS_PER_TASK)
+            ]
+            for future in futures:
+                future.result()
+            return {name: results[:, i].copy() for i, name in enumerate(HOUSEHOLD_COLUMNS)}
+        finally:
+            del results
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> SimulationExecutor:
+    """Process-wide executor, started on first use (again in a forked child)."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = SimulationExecutor()
+            _executor_pid = os.getpid()
+        return _executor
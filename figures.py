@@ -0,0 +1,65 @@
+"""
+Pre-validated figure templates.
+Each chart's static part (trace styling, layout, hover templates) goes
+through plotly.graph_objects once, on first use, and is kept as JSON.
+Building a figure per request loads that skeleton and fills in the data
+arrays, so Plotly's property validators stay off the hot path (and, until
+a chart is first drawn, off the import path).
+"""
+
+import json
+import threading
+from typing import Callable, Dict
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+try:
+    # Plotly 6+ sends numpy arrays to the browser as base64 typed arrays
+    from _plotly_utils.utils import to_typed_array_spec
+except ImportError:
+    to_typed_array_spec = None
+
+
+def encode_array(value):
+    """A data array as go.Figure would serialize it."""
+    if to_typed_array_spec is not None and isinstance(value, np.ndarray):
+        return to_typed_array_spec(value)
+    return value
+
+
+class FigureTemplate:
+    """
+    Serialized figure skeleton with the data left out.
+
+    build returns the skeleton go.Figure and is called on first use.
+    render() returns a plain figure dict that Dash serializes like a
+    go.Figure; its data arrays are not validated.
+    """
+
+    def __init__(self, build: Callable[[], go.Figure]):
+        self._build = build
+        self._skeleton = None
+        self._lock = threading.Lock()
+
+    def load(self) -> str:
+        """The serialized skeleton, built on the first call."""
+        if self._skeleton is None:
+            with self._lock:
+                if self._skeleton is None:
+                    self._skeleton = json.dumps(self._build().to_plotly_json(), cls=PlotlyJSONEncoder)
+        return self._skeleton
+
+    def render(self, traces: Dict[int, Dict[str, object]]) -> dict:
+        """
+        Figure with the skeleton traces whose index is in traces, in
+        skeleton order, each updated with its properties there.
+        """
+        # Loading the JSON is also the cheapest deep copy of the skeleton
+        figure = json.loads(self.load())
+        figure["data"] = [
+            dict(trace, **{name: encode_array(value) for name, value in traces[i].items()})
+            for i, trace in enumerate(figure["data"]) if i in traces
+        ]
+        return figure
@@ -0,0 +1,98 @@
+"""
+Gunicorn configuration for app:server.
+Loaded automatically from the working directory (or with -c). Every knob
+can be overridden through the environment:
+
+    PORT                      Listen port (7860)
+    GUNICORN_WORKER_CLASS     sync or gthread (gthread)
+    WEB_CONCURRENCY           Worker processes (CPUs for gthread, 2 x CPUs + 1 for sync)
+    GUNICORN_THREADS          Threads per gthread worker (4)
+    GUNICORN_MAX_REQUESTS     Requests before a worker is recycled, 0 = never (1000)
+    GUNICORN_KEEPALIVE        Seconds to hold idle keep-alive connections (5)
+    GUNICORN_TIMEOUT          Seconds before a silent worker is restarted (60)
+    GUNICORN_PRELOAD          Build the app once before forking, 0 = per worker (1)
+    METRICS_DIR               Where workers pool /metrics series (<tmp>/retirement-calculator-metrics)
+    SIMULATION_WORKERS        Monte Carlo pool processes per worker (CPUs / workers)
+"""
+
+import os
+import shutil
+import tempfile
+
+WORKER_CLASSES = ("sync", "gthread")
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects container CPU sets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+cpus = available_cpus()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 7860)}"
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {worker_class!r}")
+
+# Callbacks are CPU-bound, so a gthread worker per CPU with a few threads
+# to overlap I/O and the numpy sections that release the GIL; sync workers
+# handle one request each and need more processes
+if worker_class == "gthread":
+    workers = int(os.environ.get("WEB_CONCURRENCY", cpus))
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+else:
+    workers = int(os.environ.get("WEB_CONCURRENCY", 2 * cpus + 1))
+    threads = 1
+
+# Read by executor.py to give each worker's simulation pool its share of the CPUs
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Recycle workers to bound memory growth; jitter keeps them from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+
+# Imports, layout and warm-up run once in the master; workers share them copy-on-write
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+# Read by metrics.py; set before the app is imported so every worker shares it
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "retirement-calculator-metrics"))
+
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Series from an earlier run (or the preloaded app's warm-up) are not this run's
+    import metrics
+    metrics.reset()
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+
+
+def post_fork(server, worker):
+    import metrics
+    metrics.reset()
+
+
+def worker_exit(server, worker):
+    import metrics
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    server.log.info(
+        "Serving with %d %s worker(s) x %d thread(s), max_requests %d, keepalive %ds, preload %s",
+        workers, worker_class, threads, max_requests, keepalive, preload_app
+    )
@@ -0,0 +1,138 @@
+"""
+IRS limits indexed for future years.
+Precomputes per-year and per-year x age limit arrays from the 2026 values
+in constants.py so projections can look limits up by array indexing. The
+scalar calculator reads the same table through year_limits().
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from constants import *
+
+TABLE_END_YEAR = 2100
+TABLE_MAX_AGE = 120
+
+# Per-year arrays year_limits() returns as plain numbers
+YEAR_LIMITS = [
+    "base_deferral", "catchup_standard", "catchup_super", "total_additions", "ira_base",
+    "ira_catchup", "hsa_self", "hsa_family", "roth_catchup_fica_threshold",
+]
+
+
+def index_limit(base: float, growth: np.ndarray, step: int) -> np.ndarray:
+    """
+    Apply a cost-of-living adjustment the way the IRS does: the increase
+    over the base amount is rounded down to a multiple of step.
+    """
+    increase = base * (growth - 1)
+    return base + np.floor(increase / step) * step
+
+
+class LimitsTable:
+    """
+    Contribution limits for every year from TAX_YEAR to end_year.
+
+    Limits are indexed by an assumed annual COLA with IRS rounding:
+    401(k) deferral and catch-ups to $500, 415(c) to $1,000, IRA to $500
+    (catch-up $100), HSA to $50, Roth IRA phase-out start to $1,000 and the
+    Roth catch-up FICA threshold to $5,000. The HSA catch-up is statutory
+    and not indexed. Years past end_year reuse the last year's limits.
+    """
+
+    def __init__(
+        self,
+        cola: float = LIMIT_COLA_RATE,
+        end_year: int = TABLE_END_YEAR,
+        max_age: int = TABLE_MAX_AGE
+    ):
+        self.cola = cola
+        self.start_year = TAX_YEAR
+        self.end_year = end_year
+        self.max_age = max_age
+
+        years = np.arange(TAX_YEAR, end_year + 1)
+        growth = (1 + cola) ** (years - TAX_YEAR)
+        ages = np.arange(max_age + 1)
+
+        # Per-year limits
+        self.base_deferral = index_limit(LIMIT_401K_DEFERRAL, growth, 500)
+        self.catchup_standard = index_limit(LIMIT_401K_CATCHUP_STANDARD, growth, 500)
+        self.catchup_super = index_limit(LIMIT_401K_CATCHUP_SUPER, growth, 500)
+        self.total_additions = index_limit(LIMIT_401K_TOTAL_ADDITIONS, growth, 1_000)
+        self.ira_base = index_limit(LIMIT_IRA_CONTRIBUTION, growth, 500)
+        self.ira_catchup = index_limit(LIMIT_IRA_CATCHUP, growth, 100)
+        self.hsa_self = index_limit(LIMIT_HSA_SELF, growth, 50)
+        self.hsa_family = index_limit(LIMIT_HSA_FAMILY, growth, 50)
+        self.roth_catchup_fica_threshold = index_limit(ROTH_CATCHUP_FICA_THRESHOLD, growth, 5_000)
+
+        # Roth IRA phase-outs: the start is indexed and the range width is fixed,
+        # except MFS which is set by statute at $0-$10,000
+        self.roth_phaseout_start = {}
+        self.roth_phaseout_end = {}
+        for status, phaseout in ROTH_PHASEOUT.items():
+            if status == "mfs":
+                start = np.full(years.shape, float(phaseout["start"]))
+            else:
+                start = index_limit(phaseout["start"], growth, 1_000)
+            self.roth_phaseout_start[status] = start
+            self.roth_phaseout_end[status] = start + (phaseout["end"] - phaseout["start"])
+
+        # Per year x age limits (standard catch-up 50-59 and 64+, super catch-up 60-63)
+        standard = (ages >= 50) & ((ages <= 59) | (ages >= 64))
+        super_ = (ages >= 60) & (ages <= 63)
+        self.catchup = (
+            np.outer(self.catchup_standard, standard)
+            + np.outer(self.catchup_super, super_)
+        )
+        self.max_deferral = self.base_deferral[:, None] + self.catchup
+        self.total_415c = self.total_additions[:, None] + self.catchup
+        self.ira_max = self.ira_base[:, None] + np.outer(self.ira_catchup, ages >= 50)
+        hsa_catchup = np.where(ages >= 55, LIMIT_HSA_CATCHUP, 0)
+        self.hsa_self_max = self.hsa_self[:, None] + hsa_catchup
+        self.hsa_family_max = self.hsa_family[:, None] + hsa_catchup
+
+        self._year_limits = {}
+
+    def year_index(self, years) -> np.ndarray:
+        """Row index for each year, clipped to the table."""
+        return np.clip(np.asarray(years) - self.start_year, 0, self.end_year - self.start_year)
+
+    def indices(self, years, ages) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column indices for each (year, age) pair, clipped to the table."""
+        age_index = np.clip(np.asarray(ages), 0, self.max_age).astype(np.intp)
+        return self.year_index(years), age_index
+
+    def year_limits(self, year: int = TAX_YEAR) -> Dict:
+        """
+        One year's YEAR_LIMITS as ints, plus "roth_phaseout": {status:
+        (start, end)}. Cached per year; the dict is shared and must not be
+        mutated.
+        """
+        limits = self._year_limits.get(year)
+        if limits is None:
+            i = int(self.year_index(year))
+            limits = {name: int(getattr(self, name)[i]) for name in YEAR_LIMITS}
+            limits["roth_phaseout"] = {
+                status: (int(self.roth_phaseout_start[status][i]), int(self.roth_phaseout_end[status][i]))
+                for status in ROTH_PHASEOUT
+            }
+            self._year_limits[year] = limits
+        return limits
+
+    def roth_phaseout(self, years, filing_status) -> Dict[str, np.ndarray]:
+        """Phase-out start/end per year. Unknown filing statuses use single."""
+        year_index = self.year_index(years)
+        filing_status = np.asarray(filing_status)
+        statuses = [filing_status == status for status in ROTH_PHASEOUT]
+        return {
+            "start": np.select(statuses, [s[year_index] for s in self.roth_phaseout_start.values()],
+                               self.roth_phaseout_start["single"][year_index]),
+            "end": np.select(statuses, [e[year_index] for e in self.roth_phaseout_end.values()],
+                             self.roth_phaseout_end["single"][year_index]),
+        }
+
+
+# Default table used by the calculator and projection engine
+LIMITS = LimitsTable()
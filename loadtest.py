@@ -0,0 +1,274 @@
+"""
+HTTP load test against a locally started gunicorn app:server.
+Replays a corpus of recorded Dash callback and API requests for each
+worker/thread configuration and reports throughput, latency percentiles
+and error rate.
+
+Usage:
+    python loadtest.py record [--corpus data/replay_corpus.jsonl]
+    python loadtest.py run [--corpus ...] [--configs 1x1,2x4,4x8] [--duration 20]
+                           [--concurrency 16] [--output report.json]
+
+The corpus is JSONL with one request per line: method, path, body and an
+optional label. body is sent as JSON unless the entry has a content_type,
+in which case it is a string sent as is. `record` rebuilds it by issuing realistic form
+submissions through the app's own test client, so the Dash payloads
+always match the current callback graph.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(ROOT, "data", "replay_corpus.jsonl")
+DEFAULT_CONFIGS = "1x1,2x1,2x4,4x4"
+DEFAULT_DURATION = 20          # Seconds of load per configuration
+DEFAULT_CONCURRENCY = 16       # Client threads
+STARTUP_TIMEOUT = 30
+
+# Form values (FORM_STATES order, UI units) for recorded submissions
+RECORDED_FORMS = [
+    [25, 65, 60000, "single", 55000, 3, 2.5, 100, 6, None, "no", "no", "self", 2000, 0, 5000, 0, 0, "1"],
+    [35, 65, 150000, "single", 150000, 3, 2.5, 100, 6, None, "yes", "yes", "self", 4400, 7500, 50000, 20000, 5000, "26"],
+    [42, 62, 240000, "mfj", 230000, 4, 2.5, 50, 6, 10000, "yes", "no", "family", 8750, 7500, 300000, 60000, 15000, "24"],
+    [52, 67, 180000, "hoh", 175000, 2, 3, 100, 4, None, "no", "no", "none", 0, 0, 450000, 90000, 0, "12"],
+    [61, 70, 320000, "mfj", 310000, 2, 2.5, 100, 5, None, "yes", "yes", "family", 9750, 8600, 1200000, 250000, 40000, "1"],
+    [30, 90, 95000, "mfs", 90000, 5, 2, 100, 3, 3000, "no", "no", "self", 4400, 0, 20000, 5000, 1000, "26"],
+]
+
+# API bodies for recorded REST requests
+RECORDED_API = [
+    ("/api/v1/calculate", {"age": 45, "salary": 160000, "magi": 160000, "filing_status": "single",
+                           "match_percent": 1.0, "match_cap_percent": 0.06, "hsa_coverage": "self",
+                           "total_hsa": 4400, "prior_year_fica": 150000}),
+    ("/api/v1/calculate", {"age": 62, "salary": 90000, "magi": 120000, "filing_status": "mfj"}),
+    ("/api/v1/project", {"current_age": 35, "retirement_age": 65, "current_salary": 150000,
+                         "existing_401k": 50000, "match_percent": 1.0, "match_cap_percent": 0.06,
+                         "columnar": True}),
+    ("/api/v1/project", {"current_age": 25, "retirement_age": 85, "current_salary": 80000,
+                         "existing_401k": 2000000, "monte_carlo_paths": 2000, "seed": 1,
+                         "target_balance": 5000000, "columnar": True}),
+    ("/api/v1/calculate:batch", {"records": [
+        {"age": age, "salary": salary, "magi": salary}
+        for age, salary in itertools.product((25, 40, 55, 63), (50000, 150000, 400000))
+    ]}),
+]
+
+
+# Streamed uploads: (path, content type, body)
+RECORDED_STREAMS = [
+    ("/api/v1/calculate:stream", "application/x-ndjson", "".join(
+        json.dumps({"age": age, "salary": salary, "magi": salary, "hsa_coverage": "self", "total_hsa": 4400}) + "\n"
+        for age, salary in itertools.product(range(25, 65, 4), (50000, 150000, 400000))
+    )),
+    ("/api/v1/calculate:stream", "text/csv", "age,salary,magi,filing_status\r\n" + "".join(
+        f"{age},{salary},{salary},mfj\r\n" for age, salary in itertools.product(range(30, 70, 5), (90000, 250000))
+    )),
+]
+
+
+def encode_body(entry: Dict) -> tuple:
+    """(body bytes, content type) to send for a corpus entry."""
+    if "content_type" in entry:
+        return entry["body"].encode(), entry["content_type"]
+    return json.dumps(entry["body"]).encode(), "application/json"
+
+
+def dash_payload(dependency: Dict, values: Dict[str, object], changed: str) -> Dict:
+    """/_dash-update-component body for one callback from _dash-dependencies."""
+    outputs = []
+    for output in dependency["output"].strip(".").split("..."):
+        component_id, prop = output.split(".", 1)
+        outputs.append({"id": component_id, "property": prop})
+    return {
+        "output": dependency["output"],
+        "outputs": outputs if dependency["output"].startswith("..") else outputs[0],
+        "inputs": [dict(item, value=values.get(item["id"])) for item in dependency["inputs"]],
+        "state": [dict(item, value=values.get(item["id"])) for item in dependency["state"]],
+        "changedPropIds": [changed],
+    }
+
+
+def record(path: str) -> int:
+    """Write a corpus of Dash callback and API requests, checking each replays with 200."""
+    sys.path.insert(0, ROOT)
+    import app
+
+    client = app.server.test_client()
+    dependencies = json.loads(client.get("/_dash-dependencies").data)
+    by_output = {dependency["output"]: dependency for dependency in dependencies}
+    results = next(dep for output, dep in by_output.items() if "headline-main.children" in output)
+    form_ids = [state.component_id for state in app.FORM_STATES]
+
+    entries = []
+    for form in RECORDED_FORMS:
+        values = dict(zip(form_ids, form))
+        values.update({
+            "btn-calculate": 1, "results-fingerprints": {}, "projection-toggle": "nominal",
+            "input-goal-target": 2000000, "input-goal-scenario": "moderate",
+        })
+        entries.append({"label": "update_results", "method": "POST", "path": "/_dash-update-component",
+                        "body": dash_payload(results, values, "btn-calculate.n_clicks")})
+        entries.append({"label": "update_goal", "method": "POST", "path": "/_dash-update-component",
+                        "body": dash_payload(by_output["goal-results.children"], values, "input-goal-target.value")})
+        entries.append({"label": "update_sensitivity", "method": "POST", "path": "/_dash-update-component",
+                        "body": dash_payload(by_output["sensitivity-container.children"], values, "btn-calculate.n_clicks")})
+    for api_path, body in RECORDED_API:
+        entries.append({"label": api_path.rsplit("/", 1)[-1], "method": "POST", "path": api_path, "body": body})
+    for api_path, content_type, body in RECORDED_STREAMS:
+        entries.append({"label": api_path.rsplit("/", 1)[-1], "method": "POST", "path": api_path,
+                        "content_type": content_type, "body": body})
+
+    for entry in entries:
+        data, content_type = encode_body(entry)
+        # Buffered, so streamed responses finish inside their request context
+        response = client.open(
+            entry["path"], method=entry["method"], data=data, content_type=content_type, buffered=True
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"{entry['label']} replayed with status {response.status_code}")
+
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    return len(entries)
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Corpus entries with their bodies pre-encoded."""
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    for entry in entries:
+        entry["encoded"], entry["content_type"] = encode_body(entry)
+    return entries
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, threads: int) -> subprocess.Popen:
+    """Start gunicorn app:server and wait until it answers."""
+    # gunicorn.conf.py settings apply, except that workers are not recycled:
+    # a restart mid-run resets keep-alive connections and counts as errors
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:server", "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "--threads", str(threads), "--max-requests", "0",
+         "--log-level", "warning"],
+        cwd=ROOT
+    )
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not start within {STARTUP_TIMEOUT}s")
+
+
+def drive(port: int, corpus: List[Dict], duration: float, concurrency: int) -> Dict:
+    """Replay the corpus from concurrency keep-alive clients for duration seconds."""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop = time.perf_counter() + duration
+
+    def client(index: int) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        # Stagger clients through the corpus so requests are mixed
+        for entry in itertools.islice(itertools.cycle(corpus), index, None):
+            if time.perf_counter() >= stop:
+                break
+            start = time.perf_counter()
+            try:
+                connection.request(entry["method"], entry["path"], entry["encoded"],
+                                   {"Content-Type": entry["content_type"]})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            latencies[index].append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = np.concatenate([np.array(values) for values in latencies]) * 1000
+    requests = len(all_latencies)
+    p50, p95, p99 = np.percentile(all_latencies, [50, 95, 99]) if requests else (0, 0, 0)
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "error_rate": round(sum(errors) / requests, 4) if requests else 0.0,
+    }
+
+
+def run(corpus_path: str, configs: str, duration: float, concurrency: int) -> Dict:
+    """Load-test every workers x threads configuration in turn."""
+    corpus = load_corpus(corpus_path)
+    report = {"corpus": os.path.basename(corpus_path), "entries": len(corpus),
+              "duration_s": duration, "concurrency": concurrency, "configs": {}}
+    for config in configs.split(","):
+        workers, threads = (int(value) for value in config.split("x"))
+        port = free_port()
+        process = start_server(port, workers, threads)
+        try:
+            drive(port, corpus, min(duration, 2), concurrency)       # Warm caches and imports
+            result = drive(port, corpus, duration, concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        report["configs"][config] = result
+        print(f"{config:>6} workers x threads: {result['throughput_rps']:>8.1f} req/s  "
+              f"p50 {result['p50_ms']:>7.1f} ms  p95 {result['p95_ms']:>7.1f} ms  "
+              f"p99 {result['p99_ms']:>7.1f} ms  errors {result['error_rate']:.2%}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded requests against gunicorn app:server.")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="Replay corpus (JSONL)")
+    parser.add_argument("--configs", default=DEFAULT_CONFIGS, help="Comma-separated WORKERSxTHREADS list")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds per configuration")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent clients")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        print(f"Recorded {record(args.corpus)} requests to {args.corpus}", file=sys.stderr)
+    else:
+        text = json.dumps(run(args.corpus, args.configs, args.duration, args.concurrency), indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
@@ -0,0 +1,350 @@
+"""
+Prometheus-style metrics.
+Latency histograms for Dash callbacks and hot functions, HTTP request
+counts and payload sizes, rendered in the Prometheus text format for the
+/metrics endpoint. Observing a value costs a lock and a bisect.
+
+With METRICS_DIR set (gunicorn.conf.py sets it), every worker process
+writes a snapshot of its series there every FLUSH_INTERVAL seconds from a
+background thread, and a scrape served by any worker reports the sum over all of
+them, including workers that have exited, so counters never go backwards.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+from flask import Flask, g, request
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS_DIR = os.environ.get("METRICS_DIR")        # Unset = this process only
+FLUSH_INTERVAL = 1.0                               # Seconds between snapshot writes
+ARCHIVE_FILE = "archive.json"                      # Totals of exited workers
+CACHE_COUNTERS = ("hits", "misses", "evictions", "coalesced", "bypassed")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by one tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def state(self) -> list:
+        """[label values, [bucket counts, sum]] per series, for snapshots."""
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._series.items()]
+
+    def merge(self, state: list) -> None:
+        """Add a state() from another process."""
+        with self._lock:
+            for key, (counts, total) in state:
+                series = self._series.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+
+    def empty(self) -> "Histogram":
+        return Histogram(self.name, self.help, self.labels, self.buckets)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for label_values, counts, total in sorted(series):
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by one tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def state(self) -> list:
+        """[label values, value] per series, for snapshots."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, state: list) -> None:
+        """Add a state() from another process."""
+        with self._lock:
+            for key, value in state:
+                self._values[tuple(key)] = self._values.get(tuple(key), 0) + value
+
+    def empty(self) -> "Counter":
+        return Counter(self.name, self.help, self.labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+CALLBACK_LATENCY = Histogram(
+    "dash_callback_duration_seconds", "Server-side Dash callback run time.", ("callback",), LATENCY_BUCKETS
+)
+FUNCTION_LATENCY = Histogram(
+    "function_duration_seconds", "Run time of instrumented calculation and chart functions.",
+    ("function",), LATENCY_BUCKETS
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request handling time.", ("method", "route"), LATENCY_BUCKETS
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "HTTP request body size.", ("method", "route"), SIZE_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size (streamed responses excluded).",
+    ("method", "route"), SIZE_BUCKETS
+)
+REQUESTS = Counter("http_requests_total", "HTTP requests by status.", ("method", "route", "status"))
+
+METRICS = [CALLBACK_LATENCY, FUNCTION_LATENCY, REQUEST_LATENCY, REQUEST_SIZE, RESPONSE_SIZE, REQUESTS]
+
+
+def timed(name: str, histogram: Histogram = FUNCTION_LATENCY) -> Callable:
+    """Decorator recording each call's run time in histogram under name."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot(cache_stats: Dict[str, Dict] = None) -> Dict:
+    """This process's series and result cache counters, JSON-serializable."""
+    return {
+        "metrics": {metric.name: metric.state() for metric in METRICS},
+        "caches": {
+            cache: {field: stats[field] for field in CACHE_COUNTERS + ("size",)}
+            for cache, stats in (cache_stats or {}).items()
+        },
+    }
+
+
+def reset() -> None:
+    """
+    Forget every observation and stop this process's snapshot thread, e.g.
+    for the preloaded app's warm-up in the gunicorn master and its workers.
+    """
+    global _flusher_pid
+    _flusher_pid = None
+    for metric in METRICS:
+        metric.clear()
+
+
+def _write_json(path: str, value: Dict) -> None:
+    # Write then rename, so readers never see a partial file
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(value, f)
+    os.replace(temporary, path)
+
+
+_cache_stats_source = None
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def flush() -> None:
+    """Write this process's snapshot to METRICS_DIR."""
+    if METRICS_DIR is None:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    cache_stats = _cache_stats_source() if _cache_stats_source is not None else None
+    _write_json(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), snapshot(cache_stats))
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Fold an exited worker's snapshot into the archive and remove it. Call
+    from one process only (the gunicorn master's child_exit hook).
+    """
+    if METRICS_DIR is None:
+        return
+    path = os.path.join(METRICS_DIR, f"{pid}.json")
+    try:
+        with open(path) as f:
+            dead = json.load(f)
+    except (OSError, ValueError):
+        return
+    archive = _load_snapshots([os.path.join(METRICS_DIR, ARCHIVE_FILE)], [dead])
+    # Exited workers hold no cache entries
+    for stats in archive["caches"].values():
+        stats["size"] = 0
+    _write_json(os.path.join(METRICS_DIR, ARCHIVE_FILE), archive)
+    os.remove(path)
+
+
+def _load_snapshots(paths: List[str], extra: List[Dict] = ()) -> Dict:
+    """Sum of the snapshots in paths (unreadable ones skipped) and extra, as one snapshot."""
+    metrics = {metric.name: metric.empty() for metric in METRICS}
+    caches = {}
+    snapshots = list(extra)
+    for path in paths:
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    for data in snapshots:
+        for name, state in data["metrics"].items():
+            if name in metrics:
+                metrics[name].merge(state)
+        for cache, stats in data["caches"].items():
+            total = caches.setdefault(cache, dict.fromkeys(CACHE_COUNTERS + ("size",), 0))
+            for field, value in stats.items():
+                total[field] += value
+    return {"metrics": {name: metric.state() for name, metric in metrics.items()}, "caches": caches}
+
+
+def _start_flusher() -> None:
+    """Start this process's snapshot thread once (threads do not survive fork)."""
+    global _flusher_pid
+    if METRICS_DIR is None or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    def run(pid: int):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            if _flusher_pid != pid:
+                return
+            flush()
+
+    threading.Thread(target=run, args=(_flusher_pid,), daemon=True).start()
+
+
+def instrument_requests(server: Flask, cache_stats: Callable[[], Dict[str, Dict]] = None) -> None:
+    """
+    Record latency, sizes and status of every request handled by server.
+    cache_stats, if given, supplies the result cache counters for snapshots.
+    """
+    global _cache_stats_source
+    _cache_stats_source = cache_stats
+    if METRICS_DIR is not None:
+        atexit.register(flush)
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        method = request.method
+        REQUEST_LATENCY.observe(time.perf_counter() - start, method, route)
+        if request.content_length is not None:
+            REQUEST_SIZE.observe(request.content_length, method, route)
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_SIZE.observe(response.content_length, method, route)
+        REQUESTS.inc(method, route, str(response.status_code))
+        _start_flusher()
+        return response
+
+
+def render_metrics(cache_stats: Dict[str, Dict] = None, startup_times: Dict[str, float] = None) -> str:
+    """
+    All metrics, plus result cache counters and startup phase times, in the
+    Prometheus text format. With METRICS_DIR set, series and cache counters
+    are summed over every worker process.
+    """
+    metrics = METRICS
+    if METRICS_DIR is not None:
+        flush()
+        totals = _load_snapshots(glob.glob(os.path.join(METRICS_DIR, "*.json")))
+        metrics = []
+        for metric in METRICS:
+            merged = metric.empty()
+            merged.merge(totals["metrics"][metric.name])
+            metrics.append(merged)
+        cache_stats = totals["caches"]
+
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+
+    if startup_times:
+        lines += ["# HELP app_startup_seconds Time spent in each startup phase.", "# TYPE app_startup_seconds gauge"]
+        lines += [f'app_startup_seconds{{phase="{phase}"}} {seconds}' for phase, seconds in startup_times.items()]
+
+    if cache_stats:
+        for field, kind, help in (
+            ("size", "gauge", "Entries in the result cache."),
+            ("hits", "counter", "Result cache hits."),
+            ("misses", "counter", "Result cache misses."),
+            ("evictions", "counter", "Result cache evictions and expiries."),
+            ("coalesced", "counter", "Result cache misses that waited on an identical in-flight computation."),
+            ("bypassed", "counter", "Calls that skipped the result cache (unseeded Monte Carlo, uncacheable arguments)."),
+        ):
+            name = f"result_cache_{field}" + ("_total" if kind == "counter" else "")
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{cache="{cache}"}} {stats[field]}' for cache, stats in cache_stats.items()]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,143 @@
+"""
+On-demand profiling of single requests.
+A request is profiled when it carries an X-Profile header equal to
+PROFILE_TOKEN, or when its route matches PROFILE_ROUTES, for the first
+PROFILE_LIMIT such requests per process, after which route profiling
+turns itself off. Each profiled request writes a cProfile .pstats file
+and a sampled .collapsed stack file (one "frame;frame;... count" line per
+stack, ready for flamegraph.pl or speedscope) to PROFILE_DIR, which keeps
+the newest PROFILE_KEEP profiles.
+"""
+
+import cProfile
+import glob
+import hmac
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import List
+
+from flask import Flask, g, request
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "retirement-calculator-profiles"))
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")          # Unset = header disabled
+PROFILE_ROUTES = [route for route in os.environ.get("PROFILE_ROUTES", "").split(",") if route]
+PROFILE_LIMIT = int(os.environ.get("PROFILE_LIMIT", 20))     # Route-matched profiles per process
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 100))      # Profiles kept in PROFILE_DIR
+PROFILE_HEADER = "X-Profile"
+SAMPLE_INTERVAL = 0.001                                      # Seconds between stack samples
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def collapsed(self) -> List[str]:
+        """Collapsed-stack lines, most frequent first."""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+
+_route_profiles = 0
+_route_lock = threading.Lock()
+
+
+def should_profile() -> bool:
+    """Whether the current request opted in, by admin header or (until PROFILE_LIMIT is used up) route."""
+    global _route_profiles
+    token = request.headers.get(PROFILE_HEADER)
+    if token is not None and PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN):
+        return True
+    if _route_profiles >= PROFILE_LIMIT or not any(request.path.startswith(route) for route in PROFILE_ROUTES):
+        return False
+    with _route_lock:
+        if _route_profiles >= PROFILE_LIMIT:
+            return False
+        _route_profiles += 1
+    return True
+
+
+def prune_profiles(keep: int = PROFILE_KEEP) -> None:
+    """Delete all but the newest keep profiles (.pstats and .collapsed pairs) in PROFILE_DIR."""
+    stems = sorted(
+        (path[:-len(".pstats")] for path in glob.glob(os.path.join(PROFILE_DIR, "*.pstats"))),
+        key=lambda stem: os.path.getmtime(f"{stem}.pstats") if os.path.exists(f"{stem}.pstats") else 0
+    )
+    for stem in stems[:max(len(stems) - keep, 0)]:
+        for suffix in (".pstats", ".collapsed"):
+            try:
+                os.remove(stem + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def write_profile(profiler: cProfile.Profile, sampler: StackSampler, label: str) -> str:
+    """Write the .pstats and .collapsed files and return their common path stem."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = label.strip("/").replace("/", "_").replace(":", "_") or "root"
+    now = time.time()
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+    stem = os.path.join(PROFILE_DIR, f"{stamp}-{os.getpid()}-{threading.get_ident()}-{slug}")
+    profiler.dump_stats(f"{stem}.pstats")
+    with open(f"{stem}.collapsed", "w") as f:
+        f.write("\n".join(sampler.collapsed()) + "\n")
+    prune_profiles()
+    return stem
+
+
+def install_profiling(server: Flask) -> None:
+    """Profile opted-in requests handled by server (streamed bodies are not included)."""
+    @server.before_request
+    def start_profile():
+        if not should_profile():
+            return
+        g.profile_sampler = StackSampler(threading.get_ident())
+        g.profiler = cProfile.Profile()
+        g.profile_sampler.start()
+        g.profiler.enable()
+
+    @server.after_request
+    def finish_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        sampler = g.pop("profile_sampler")
+        sampler.stop()
+        stem = write_profile(profiler, sampler, request.path)
+        response.headers["X-Profile-Id"] = os.path.basename(stem)
+        return response
+
+    @server.teardown_request
+    def abandon_profile(error):
+        # after_request does not run when the view raised
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            g.pop("profile_sampler").stop()
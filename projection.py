@@ -4,157 +4,489 @@ Projects portfolio growth over time with multiple scenarios.
 """
 
 from typing import List, Dict
-from calculator import calculate_401k_limits, calculate_employer_match, calculate_hsa_limit, calculate_roth_ira_limit
+
+import numpy as np
+
+from calculator import (
+    calculate_401k_limits_array,
+    calculate_roth_ira_limit_array,
+    calculate_hsa_limit_array,
+)
 from constants import *
 
+START_YEAR = TAX_YEAR
 
-def project_retirement(
+SCENARIO_RATES = {
+    "conservative": DEFAULT_RETURN_CONSERVATIVE,
+    "moderate": DEFAULT_RETURN_MODERATE,
+    "aggressive": DEFAULT_RETURN_AGGRESSIVE,
+}
+
+
+def build_contribution_schedule(
     current_age: int,
-    retirement_age: int,
+    years: int,
     current_salary: float,
     annual_raise_pct: float,
-    existing_401k: float,
-    existing_ira: float,
-    existing_hsa: float,
     match_percent: float,
     match_cap_percent: float,
     match_dollar_cap: float,
     plan_allows_mega: bool,
     hsa_coverage: str,
     total_hsa: float,
-    inflation_rate: float = DEFAULT_INFLATION_RATE,
     magi: float = 0,
     filing_status: str = "single",
     backdoor_roth: float = 0
-) -> Dict:
+) -> Dict[str, np.ndarray]:
     """
-    Project retirement savings year by year.
+    Build the per-year contribution schedule as arrays of length years + 1.
 
-    Returns projections for 3 scenarios: conservative (5%), moderate (7%), aggressive (10%).
+    Applies the vectorized calculator rules once over the whole age vector
+    instead of once per year, with limits indexed for each future year
+    (see limits.LimitsTable). annual_raise_pct may also be an array of n
+    rates, which makes salary and k401 (n, years + 1).
     """
-    years = retirement_age - current_age
-    if years <= 0:
-        return {"error": "Retirement age must be greater than current age"}
+    offsets = np.arange(years + 1)
+    calendar_years = START_YEAR + offsets
+    ages = current_age + offsets
+    # A vector of raise rates adds a leading axis to the salary-based columns
+    salary = current_salary * (1 + np.asarray(annual_raise_pct, dtype=float)[..., None]) ** offsets
+
+    # Limits by age
+    k401_limits = calculate_401k_limits_array(ages, calendar_years)
+    ira_info = calculate_roth_ira_limit_array(ages, magi, filing_status, calendar_years)
+    hsa_info = calculate_hsa_limit_array(ages, hsa_coverage, total_hsa, calendar_years)
+
+    # Employee deferral (capped by salary)
+    employee_deferral = np.minimum(k401_limits["max_deferral"], salary)
+
+    # Employer match
+    employer_match = salary * match_cap_percent * match_percent
+    if match_dollar_cap:
+        employer_match = np.minimum(employer_match, match_dollar_cap)
+
+    # Mega backdoor room
+    if plan_allows_mega:
+        total_limit = np.minimum(k401_limits["total_415c"], salary)
+        mega_room = np.maximum(0, total_limit - employee_deferral - employer_match)
+    else:
+        mega_room = np.zeros_like(salary)
 
-    scenarios = {
-        "conservative": {"rate": DEFAULT_RETURN_CONSERVATIVE, "data": []},
-        "moderate": {"rate": DEFAULT_RETURN_MODERATE, "data": []},
-        "aggressive": {"rate": DEFAULT_RETURN_AGGRESSIVE, "data": []}
+    # IRA: use backdoor if income exceeds the Roth limit
+    ira = np.where(
+        ira_info["suggest_backdoor"],
+        np.minimum(backdoor_roth, ira_info["max_limit"]),
+        ira_info["allowed_contribution"]
+    ).astype(float)
+
+    # HSA contribution (use provided total, capped by limits)
+    hsa = hsa_info["total_contribution"].astype(float)
+
+    return {
+        "year": calendar_years,
+        "age": ages,
+        "salary": salary,
+        "k401": employee_deferral + employer_match + mega_room,
+        "ira": ira,
+        "hsa": hsa,
     }
 
-    # Initialize balances for each scenario
-    for scenario in scenarios.values():
-        scenario["balance_401k"] = existing_401k
-        scenario["balance_ira"] = existing_ira
-        scenario["balance_hsa"] = existing_hsa
 
-    current_year = 2026  # Starting year
-    salary = current_salary
-    age = current_age
+def contribution_growth(step: np.ndarray, periods_per_year: int = 1) -> np.ndarray:
+    """
+    Growth to year end of a year's contributions, per dollar contributed.
 
-    for year_offset in range(years + 1):
-        year = current_year + year_offset
+    The year's contribution is paid in periods_per_year equal installments,
+    each at the end of its period like a paycheck deduction, and the year's
+    growth factor step compounds evenly over the periods (factor
+    q = step ** (1 / P) each), so the installment of period j grows for
+    P - j periods (an ordinary annuity):
+    (1 / P) * sum_{j=1..P} q^(P - j) = (step - 1) / (P * (q - 1)).
+    One period keeps the annual model's single start-of-year deposit,
+    i.e. step itself.
+    """
+    step = np.asarray(step, dtype=float)
+    if periods_per_year == 1:
+        return step
+    q = step ** (1 / periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = (step - 1) / (periods_per_year * (q - 1))
+    # Zero return: every installment is worth its face value
+    return np.where(q == 1, 1.0, factor)
 
-        # Calculate limits based on current age
-        k401_limits = calculate_401k_limits(age)
 
-        # IRA limit - check if income exceeds Roth limit (use backdoor if so)
-        ira_info = calculate_roth_ira_limit(age, magi, filing_status)
-        if ira_info["suggest_backdoor"]:
-            ira_limit = min(backdoor_roth, ira_info["max_limit"])
-        else:
-            ira_limit = ira_info["allowed_contribution"]
+def compound_balances(
+    opening_balance: float,
+    contributions: np.ndarray,
+    growth: np.ndarray,
+    step: np.ndarray,
+    periods_per_year: int = 1
+) -> np.ndarray:
+    """
+    Closed form of balance = balance * step + contribution * contribution_growth(step),
+    year by year.
 
-        # HSA contribution (use provided total, capped by limits)
-        hsa_info = calculate_hsa_limit(age, hsa_coverage, total_hsa)
-        hsa_contribution = hsa_info["total_contribution"]
+    growth is the cumulative growth factor for each year (1 in year 0) and
+    step is that year's own factor, so growth[t] = growth[t-1] * step[t].
+    With periods_per_year = 1 this is balance = (balance + contribution) * step.
+    """
+    deposits = np.asarray(contributions, dtype=float).copy()
+    deposits[0] = 0                            # No contribution before the first year
+    # B_t = G_t * (B_0 + sum_{k=1..t} c_k * a_k / G_k), a_k = contribution_growth(step_k)
+    deposit_growth = contribution_growth(step, periods_per_year)
+    return growth * (opening_balance + np.cumsum(deposits * deposit_growth / growth, axis=-1))
 
-        # Employee deferral (capped by salary)
-        employee_deferral = min(k401_limits["max_deferral"], salary)
 
-        # Employer match
-        employer_match = calculate_employer_match(
-            salary, match_percent, match_cap_percent, match_dollar_cap
-        )
+def grow_balances(
+    opening_balance: float,
+    contributions: np.ndarray,
+    rates: np.ndarray,
+    periods_per_year: int = 1
+) -> np.ndarray:
+    """
+    Compound a balance with periodic contributions for several rates at once.
 
-        # Mega backdoor room
-        if plan_allows_mega:
-            total_limit = min(k401_limits["total_415c"], salary)
-            mega_room = max(0, total_limit - employee_deferral - employer_match)
-        else:
-            mega_room = 0
+    Year 0 holds the opening balance; each later year adds that year's
+    contribution in periods_per_year installments (one = start of year,
+    more = end of each period) while growth applies. Returns a (rates x years) array.
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))[:, None]
+    growth = (1 + rates) ** np.arange(len(contributions))
+    return compound_balances(opening_balance, contributions, growth, 1 + rates, periods_per_year)
+
+
+def simulate_balances(
+    schedule: Dict[str, np.ndarray],
+    opening_balance: float,
+    paths: int,
+    mean_return: float = DEFAULT_RETURN_MODERATE,
+    volatility: float = DEFAULT_RETURN_VOLATILITY,
+    rng: np.random.Generator = None,
+    periods_per_year: int = 1
+) -> np.ndarray:
+    """
+    Nominal combined balance for each of `paths` random return paths,
+    as a (paths x years + 1) matrix. Annual returns are lognormal with
+    the given arithmetic mean and volatility; within a year they compound
+    evenly over periods_per_year contribution periods.
 
-        # Total annual contribution
-        annual_401k = employee_deferral + employer_match + mega_room
+    Draws come from rng in order, so simulating in batches from one
+    generator gives the same paths as a single call.
+    """
+    contributions = schedule["k401"] + schedule["ira"] + schedule["hsa"]
+    years = len(contributions) - 1
 
-        for name, scenario in scenarios.items():
-            rate = scenario["rate"]
+    # Lognormal parameters matching the arithmetic mean and volatility
+    sigma = np.sqrt(np.log1p((volatility / (1 + mean_return)) ** 2))
+    mu = np.log1p(mean_return) - sigma ** 2 / 2
 
-            if year_offset == 0:
-                # First year - just starting balances
-                total = scenario["balance_401k"] + scenario["balance_ira"] + scenario["balance_hsa"]
-            else:
-                # Add contributions and apply growth
-                scenario["balance_401k"] = (scenario["balance_401k"] + annual_401k) * (1 + rate)
-                scenario["balance_ira"] = (scenario["balance_ira"] + ira_limit) * (1 + rate)
-                scenario["balance_hsa"] = (scenario["balance_hsa"] + hsa_contribution) * (1 + rate)
-                total = scenario["balance_401k"] + scenario["balance_ira"] + scenario["balance_hsa"]
+    rng = rng if rng is not None else np.random.default_rng()
+    log_returns = np.zeros((paths, years + 1))
+    log_returns[:, 1:] = rng.normal(mu, sigma, size=(paths, years))
+    step = np.exp(log_returns)
+    growth = np.exp(np.cumsum(log_returns, axis=1))
 
-            # Inflation-adjusted value
-            inflation_factor = (1 + inflation_rate) ** year_offset
-            real_value = total / inflation_factor
+    return compound_balances(opening_balance, contributions, growth, step, periods_per_year)
 
-            scenario["data"].append({
-                "year": year,
-                "age": age,
-                "nominal": round(total, 0),
-                "real": round(real_value, 0),
-                "balance_401k": round(scenario["balance_401k"], 0),
-                "balance_ira": round(scenario["balance_ira"], 0),
-                "balance_hsa": round(scenario["balance_hsa"], 0),
-                "annual_contribution": round(annual_401k + ira_limit + hsa_contribution, 0),
-                "salary": round(salary, 0)
-            })
-
-        # Next year: age increases, salary grows
-        age += 1
-        salary *= (1 + annual_raise_pct)
-
-    # Final results
-    final_conservative = scenarios["conservative"]["data"][-1]
-    final_moderate = scenarios["moderate"]["data"][-1]
-    final_aggressive = scenarios["aggressive"]["data"][-1]
+
+def summarize_simulation(
+    nominal: np.ndarray,
+    schedule: Dict[str, np.ndarray],
+    inflation_rate: float = DEFAULT_INFLATION_RATE,
+    mean_return: float = DEFAULT_RETURN_MODERATE,
+    volatility: float = DEFAULT_RETURN_VOLATILITY,
+    target_balance: float = None
+) -> Dict:
+    """Percentile bands and probability of reaching target_balance from simulated balances."""
+    years = nominal.shape[1] - 1
+    p10, p50, p90 = np.percentile(nominal, [10, 50, 90], axis=0)
+    deflator = (1 + inflation_rate) ** np.arange(years + 1)
+
+    final = nominal[:, -1]
+    probability = float(np.mean(final >= target_balance)) if target_balance is not None else None
 
     return {
-        "years_to_retirement": years,
-        "retirement_year": current_year + years,
-        "scenarios": {
-            "conservative": scenarios["conservative"]["data"],
-            "moderate": scenarios["moderate"]["data"],
-            "aggressive": scenarios["aggressive"]["data"]
-        },
-        "final_balances": {
-            "conservative": {
-                "nominal": final_conservative["nominal"],
-                "real": final_conservative["real"]
-            },
-            "moderate": {
-                "nominal": final_moderate["nominal"],
-                "real": final_moderate["real"]
-            },
-            "aggressive": {
-                "nominal": final_aggressive["nominal"],
-                "real": final_aggressive["real"]
+        "paths": len(nominal),
+        "mean_return": mean_return,
+        "volatility": volatility,
+        "year": schedule["year"].tolist(),
+        "p10": np.round(p10, 0).tolist(),
+        "p50": np.round(p50, 0).tolist(),
+        "p90": np.round(p90, 0).tolist(),
+        "p10_real": np.round(p10 / deflator, 0).tolist(),
+        "p50_real": np.round(p50 / deflator, 0).tolist(),
+        "p90_real": np.round(p90 / deflator, 0).tolist(),
+        "target_balance": target_balance,
+        "probability_of_target": probability
+    }
+
+
+def simulate_returns(
+    schedule: Dict[str, np.ndarray],
+    opening_balance: float,
+    inflation_rate: float = DEFAULT_INFLATION_RATE,
+    paths: int = DEFAULT_SIMULATION_PATHS,
+    mean_return: float = DEFAULT_RETURN_MODERATE,
+    volatility: float = DEFAULT_RETURN_VOLATILITY,
+    target_balance: float = None,
+    seed: int = None,
+    periods_per_year: int = 1
+) -> Dict:
+    """
+    Monte Carlo projection of the combined balance over random return paths.
+
+    All paths are simulated as one (paths x years) matrix using the
+    contribution schedule from build_contribution_schedule. Runs of
+    executor.PARALLEL_PATHS paths or more are spread over the process
+    pool instead, in blocks seeded from seed, so they draw different
+    paths than a serial run with the same seed would.
+    """
+    # Imported here: executor imports this module
+    import executor
+    if executor.use_executor(paths):
+        return executor.get_executor().simulate(
+            schedule, opening_balance, paths, inflation_rate, mean_return, volatility,
+            target_balance, seed, periods_per_year
+        )
+
+    nominal = simulate_balances(
+        schedule, opening_balance, paths, mean_return, volatility, np.random.default_rng(seed),
+        periods_per_year
+    )
+    return summarize_simulation(nominal, schedule, inflation_rate, mean_return, volatility, target_balance)
+
+
+def _scenario_rows(
+    schedule: Dict[str, np.ndarray],
+    balances: Dict[str, np.ndarray],
+    contributions: np.ndarray,
+    salary: np.ndarray
+) -> Dict[str, List[Dict]]:
+    """Expand projection columns into the per-year dicts of each scenario."""
+    year_col = schedule["year"].tolist()
+    age_col = schedule["age"].tolist()
+    contribution_col = contributions.tolist()
+    salary_col = salary.tolist()
+
+    scenarios = {}
+    for i, name in enumerate(SCENARIO_RATES):
+        scenarios[name] = [
+            {
+                "year": year,
+                "age": age,
+                "nominal": nom,
+                "real": rl,
+                "balance_401k": b401k,
+                "balance_ira": bira,
+                "balance_hsa": bhsa,
+                "annual_contribution": contribution,
+                "salary": sal
             }
-        },
-        "headline": {
-            "low_nominal": final_conservative["nominal"],
-            "high_nominal": final_aggressive["nominal"],
-            "low_real": final_conservative["real"],
-            "high_real": final_aggressive["real"],
-            "retirement_year": current_year + years
+            for year, age, nom, rl, b401k, bira, bhsa, contribution, sal in zip(
+                year_col, age_col,
+                balances["nominal"][i].tolist(),
+                balances["real"][i].tolist(),
+                balances["balance_401k"][i].tolist(),
+                balances["balance_ira"][i].tolist(),
+                balances["balance_hsa"][i].tolist(),
+                contribution_col, salary_col
+            )
+        ]
+    return scenarios
+
+
+class ProjectionBasis:
+    """
+    Per-year state of a projection that does not depend on existing
+    balances or inflation: the contribution schedule, the growth factors of
+    each scenario and the discounted sum of each account's contributions.
+
+    project() finishes a projection from this state, so changing a balance
+    only rescales (balance + discounted contributions) by the growth
+    factors, and changing inflation only re-deflates. Instances are not
+    modified after construction and can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        current_age: int,
+        retirement_age: int,
+        current_salary: float,
+        annual_raise_pct: float,
+        match_percent: float,
+        match_cap_percent: float,
+        match_dollar_cap: float,
+        plan_allows_mega: bool,
+        hsa_coverage: str,
+        total_hsa: float,
+        magi: float = 0,
+        filing_status: str = "single",
+        backdoor_roth: float = 0,
+        periods_per_year: int = 1
+    ):
+        self.years = retirement_age - current_age
+        self.periods_per_year = periods_per_year
+        self.schedule = build_contribution_schedule(
+            current_age, self.years, current_salary, annual_raise_pct,
+            match_percent, match_cap_percent, match_dollar_cap,
+            plan_allows_mega, hsa_coverage, total_hsa,
+            magi, filing_status, backdoor_roth
+        )
+
+        # Growth for all scenarios x years; balance = growth * (opening + discounted)
+        rates = np.array(list(SCENARIO_RATES.values()))[:, None]
+        self.growth = (1 + rates) ** np.arange(self.years + 1)
+        deposit_growth = contribution_growth(1 + rates, periods_per_year)
+        self.discounted = {}
+        for account in ("k401", "ira", "hsa"):
+            deposits = self.schedule[account].astype(float).copy()
+            deposits[0] = 0                    # No contribution before the first year
+            self.discounted[account] = np.cumsum(deposits * deposit_growth / self.growth, axis=-1)
+
+        # Columns shared by every scenario, rounded to whole dollars
+        self.contributions = np.round(self.schedule["k401"] + self.schedule["ira"] + self.schedule["hsa"], 0)
+        self.salary = np.round(self.schedule["salary"], 0)
+
+    def project(
+        self,
+        existing_401k: float,
+        existing_ira: float,
+        existing_hsa: float,
+        inflation_rate: float = DEFAULT_INFLATION_RATE,
+        monte_carlo_paths: int = 0,
+        target_balance: float = None,
+        seed: int = None,
+        columnar: bool = False
+    ) -> Dict:
+        """Finish the projection for the given balances and inflation; see project_retirement."""
+        years = self.years
+        schedule = self.schedule
+
+        # Balances for all scenarios x years
+        balance_401k = self.growth * (existing_401k + self.discounted["k401"])
+        balance_ira = self.growth * (existing_ira + self.discounted["ira"])
+        balance_hsa = self.growth * (existing_hsa + self.discounted["hsa"])
+        nominal = balance_401k + balance_ira + balance_hsa
+
+        # Inflation-adjusted value
+        real = nominal / (1 + inflation_rate) ** np.arange(years + 1)
+
+        # Per-scenario columns, rounded to whole dollars
+        balances = {
+            "nominal": np.round(nominal, 0),
+            "real": np.round(real, 0),
+            "balance_401k": np.round(balance_401k, 0),
+            "balance_ira": np.round(balance_ira, 0),
+            "balance_hsa": np.round(balance_hsa, 0),
         }
-    }
+
+        # Final results (conservative and aggressive are the first and last rows)
+        headline = {
+            "low_nominal": float(balances["nominal"][0, -1]),
+            "high_nominal": float(balances["nominal"][-1, -1]),
+            "low_real": float(balances["real"][0, -1]),
+            "high_real": float(balances["real"][-1, -1]),
+            "retirement_year": START_YEAR + years
+        }
+
+        if columnar:
+            result = {
+                "format": "columnar",
+                "years_to_retirement": years,
+                "retirement_year": START_YEAR + years,
+                "year": schedule["year"].tolist(),
+                "age": schedule["age"].tolist(),
+                "salary": self.salary.astype(np.int64).tolist(),
+                "annual_contribution": self.contributions.astype(np.int64).tolist(),
+                "scenarios": {
+                    name: {field: values[i].astype(np.int64).tolist() for field, values in balances.items()}
+                    for i, name in enumerate(SCENARIO_RATES)
+                },
+                "headline": headline
+            }
+        else:
+            result = {
+                "years_to_retirement": years,
+                "retirement_year": START_YEAR + years,
+                "scenarios": _scenario_rows(schedule, balances, self.contributions, self.salary),
+                "final_balances": {
+                    name: {
+                        "nominal": float(balances["nominal"][i, -1]),
+                        "real": float(balances["real"][i, -1])
+                    }
+                    for i, name in enumerate(SCENARIO_RATES)
+                },
+                "headline": headline
+            }
+
+        if monte_carlo_paths > 0:
+            result["monte_carlo"] = simulate_returns(
+                schedule,
+                existing_401k + existing_ira + existing_hsa,
+                inflation_rate=inflation_rate,
+                paths=monte_carlo_paths,
+                target_balance=target_balance,
+                seed=seed,
+                periods_per_year=self.periods_per_year
+            )
+
+        return result
+
+
+def project_retirement(
+    current_age: int,
+    retirement_age: int,
+    current_salary: float,
+    annual_raise_pct: float,
+    existing_401k: float,
+    existing_ira: float,
+    existing_hsa: float,
+    match_percent: float,
+    match_cap_percent: float,
+    match_dollar_cap: float,
+    plan_allows_mega: bool,
+    hsa_coverage: str,
+    total_hsa: float,
+    inflation_rate: float = DEFAULT_INFLATION_RATE,
+    magi: float = 0,
+    filing_status: str = "single",
+    backdoor_roth: float = 0,
+    monte_carlo_paths: int = 0,
+    target_balance: float = None,
+    seed: int = None,
+    columnar: bool = False,
+    periods_per_year: int = 1
+) -> Dict:
+    """
+    Project retirement savings year by year.
+
+    Returns projections for 3 scenarios: conservative (5%), moderate (7%), aggressive (10%).
+    periods_per_year sets how each year's contributions land: 1 adds them
+    all at the start of the year, 12 / 24 / 26 spread them over monthly or
+    per-paycheck installments paid at the end of each period, with returns
+    compounding each period (at the same effective annual rate). Balances are still reported yearly.
+    With monte_carlo_paths > 0, also returns P10/P50/P90 bands from
+    simulate_returns under "monte_carlo".
+
+    With columnar=True, returns one list per field instead of a dict per
+    year: year/age/salary/annual_contribution at the top level and
+    scenarios[name][field] for the balances, all in whole dollars. This is
+    the form the app charts from and the API returns on request.
+    """
+    years = retirement_age - current_age
+    if years <= 0:
+        return {"error": "Retirement age must be greater than current age"}
+
+    basis = ProjectionBasis(
+        current_age, retirement_age, current_salary, annual_raise_pct,
+        match_percent, match_cap_percent, match_dollar_cap,
+        plan_allows_mega, hsa_coverage, total_hsa,
+        magi, filing_status, backdoor_roth, periods_per_year
+    )
+    return basis.project(
+        existing_401k, existing_ira, existing_hsa, inflation_rate,
+        monte_carlo_paths, target_balance, seed, columnar
+    )
 
 
 def format_currency(amount: float) -> str:
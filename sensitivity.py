@@ -0,0 +1,57 @@
+"""
+Sensitivity analysis: final balance across a grid of return rates and
+annual raises, evaluated as one broadcast array operation.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from constants import *
+from projection import contribution_growth
+from solver import opening_balance, schedule_from_inputs
+
+DEFAULT_RETURN_GRID = np.linspace(0.02, 0.12, 50)
+DEFAULT_RAISE_GRID = np.linspace(0.0, 0.06, 50)
+
+
+def sensitivity_grid(
+    inputs: Dict,
+    return_rates: np.ndarray = DEFAULT_RETURN_GRID,
+    raise_rates: np.ndarray = DEFAULT_RAISE_GRID
+) -> Dict:
+    """
+    Final nominal and real balance at inputs["retirement_age"] for every
+    (raise, return) pair. Rows follow raise_rates, columns return_rates.
+    """
+    years = inputs["retirement_age"] - inputs["current_age"]
+    if years <= 0:
+        return {"error": "Retirement age must be greater than current age"}
+
+    return_rates = np.asarray(return_rates, dtype=float)
+    raise_rates = np.asarray(raise_rates, dtype=float)
+
+    # One schedule row per raise rate: (raises x years + 1)
+    schedule = schedule_from_inputs(inputs, years, annual_raise_pct=raise_rates)
+    contributions = np.broadcast_to(
+        schedule["k401"] + schedule["ira"] + schedule["hsa"], (len(raise_rates), years + 1)
+    )
+
+    # Growth of year k's contributions to the end of year T: to the end of
+    # year k (contribution_growth), then (1 + r)^(T - k), with nothing
+    # deposited in year 0: (returns x years + 1)
+    exponents = np.maximum(years - np.arange(years + 1), 0)
+    deposit_growth = (1 + return_rates[:, None]) ** exponents * contribution_growth(
+        1 + return_rates[:, None], inputs.get("periods_per_year", 1)
+    )
+    deposit_growth[:, 0] = 0
+
+    nominal = opening_balance(inputs) * (1 + return_rates) ** years + contributions @ deposit_growth.T
+    real = nominal / (1 + inputs.get("inflation_rate", DEFAULT_INFLATION_RATE)) ** years
+
+    return {
+        "return_rates": return_rates.tolist(),
+        "raise_rates": raise_rates.tolist(),
+        "nominal": np.round(nominal, 0).tolist(),
+        "real": np.round(real, 0).tolist(),
+    }
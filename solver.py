@@ -0,0 +1,125 @@
+"""
+Goal-seek solvers on top of the projection engine.
+Answers "when do I reach $X" and "how much more do I need to save" without
+running full projections: the balance path is computed once from the
+contribution schedule and inverted directly.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from constants import *
+from projection import SCENARIO_RATES, build_contribution_schedule, contribution_growth, grow_balances
+
+MAX_RETIREMENT_AGE = 100
+
+# project_retirement arguments that feed the contribution schedule
+_SCHEDULE_ARGS = [
+    "current_salary", "annual_raise_pct", "match_percent", "match_cap_percent",
+    "match_dollar_cap", "plan_allows_mega", "hsa_coverage", "total_hsa",
+    "magi", "filing_status", "backdoor_roth",
+]
+
+
+def schedule_from_inputs(inputs: Dict, years: int, **overrides) -> Dict[str, np.ndarray]:
+    """Contribution schedule for project_retirement-style inputs, with optional overrides."""
+    arguments = {name: inputs[name] for name in _SCHEDULE_ARGS if name in inputs}
+    arguments.update(overrides)
+    return build_contribution_schedule(inputs["current_age"], years, **arguments)
+
+
+def opening_balance(inputs: Dict) -> float:
+    """Combined existing 401(k), IRA and HSA balance."""
+    return inputs.get("existing_401k", 0) + inputs.get("existing_ira", 0) + inputs.get("existing_hsa", 0)
+
+
+def balance_path(inputs: Dict, years: int, rate: float, real: bool = False) -> np.ndarray:
+    """
+    Combined balance at the end of each of the next `years` years for one
+    return rate. inputs holds project_retirement keyword arguments; the
+    balance after t years is the same whatever the retirement age, so one
+    path answers every horizon.
+    """
+    schedule = schedule_from_inputs(inputs, years)
+    contributions = schedule["k401"] + schedule["ira"] + schedule["hsa"]
+    path = grow_balances(opening_balance(inputs), contributions, rate, inputs.get("periods_per_year", 1))[0]
+    if real:
+        path = path / (1 + inputs.get("inflation_rate", DEFAULT_INFLATION_RATE)) ** np.arange(years + 1)
+    return path
+
+
+def solve_retirement_age(
+    inputs: Dict,
+    target_balance: float,
+    scenario: str = "moderate",
+    real: bool = False,
+    max_retirement_age: int = MAX_RETIREMENT_AGE
+) -> Dict:
+    """
+    Earliest retirement age at which the scenario's balance reaches target_balance.
+    Returns retirement_age None if it is not reached by max_retirement_age.
+    Retiring takes at least a year, so a target met today but not at the
+    end of any later year is not reached.
+    """
+    current_age = inputs["current_age"]
+    years = max_retirement_age - current_age
+    if years <= 0:
+        return {"error": "Current age must be below the maximum retirement age"}
+
+    path = balance_path(inputs, years, SCENARIO_RATES[scenario], real)
+    # Nominal balances only grow, but real balances fall in years where the
+    # return trails inflation, so check every year from 1 rather than
+    # bracketing the first crossing: path[0] meeting the target says nothing
+    # about path[1]
+    reached = np.flatnonzero(path[1:] >= target_balance) + 1
+    if len(reached) == 0:
+        return {
+            "retirement_age": None,
+            "retirement_year": None,
+            "balance": float(np.round(path[-1], 0)),
+            "max_retirement_age": max_retirement_age
+        }
+
+    years_needed = int(reached[0])
+    return {
+        "retirement_age": current_age + years_needed,
+        "retirement_year": TAX_YEAR + years_needed,
+        "balance": float(np.round(path[years_needed], 0)),
+        "max_retirement_age": max_retirement_age
+    }
+
+
+def solve_extra_contribution(
+    inputs: Dict,
+    target_balance: float,
+    scenario: str = "moderate",
+    real: bool = False
+) -> Dict:
+    """
+    Extra flat annual savings, on top of the projected contributions and
+    growing at the same rate, needed to reach target_balance by
+    inputs["retirement_age"]. Closed-form annuity inverse.
+    """
+    years = inputs["retirement_age"] - inputs["current_age"]
+    if years <= 0:
+        return {"error": "Retirement age must be greater than current age"}
+
+    rate = SCENARIO_RATES[scenario]
+    projected = balance_path(inputs, years, rate, real)[-1]
+
+    # Each extra deposit is made over years 1..T, landing like the other
+    # contributions (see contribution_growth), and grows to the end of year T
+    annuity_factor = np.sum((1 + rate) ** np.arange(years)) * contribution_growth(
+        1 + rate, inputs.get("periods_per_year", 1)
+    )
+    if real:
+        annuity_factor /= (1 + inputs.get("inflation_rate", DEFAULT_INFLATION_RATE)) ** years
+
+    extra = max(0.0, (target_balance - projected) / annuity_factor)
+    return {
+        "extra_annual": float(np.round(extra, 0)),
+        "extra_monthly": float(np.round(extra / 12, 0)),
+        "projected_balance": float(np.round(projected, 0)),
+        "on_track": bool(projected >= target_balance)
+    }
@@ -0,0 +1,43 @@
+"""
+/api/v1/backtest: historical windows, reported in today's dollars.
+Run with `python -m pytest` from the repository root.
+"""
+
+import pytest
+from flask import Flask
+
+from api import api
+
+INPUTS = {"current_age": 35, "retirement_age": 65, "current_salary": 150000, "magi": 150000}
+
+
+@pytest.fixture
+def client():
+    server = Flask(__name__)
+    server.register_blueprint(api)
+    return server.test_client()
+
+
+def test_probability_of_target_uses_real_balances(client):
+    response = client.post("/api/v1/backtest", json=dict(INPUTS, target_balance=2_000_000))
+    assert response.status_code == 200
+    result = response.get_json()
+
+    real = result["real"]
+    assert result["windows"] == len(real) == len(result["start_year"])
+    assert result["probability_of_target"] == pytest.approx(
+        sum(balance >= 2_000_000 for balance in real) / len(real), abs=1e-6
+    )
+    assert result["worst"]["real"] == min(real)
+
+
+def test_backtest_rejects_simulation_fields(client):
+    response = client.post("/api/v1/backtest", json=dict(INPUTS, monte_carlo_paths=1000))
+    assert response.status_code == 400
+    assert "monte_carlo_paths" in response.get_json()["error"]
+
+
+def test_backtest_longer_than_history(client):
+    response = client.post("/api/v1/backtest", json=dict(INPUTS, current_age=0, retirement_age=120))
+    assert response.status_code == 422
+    assert "History covers" in response.get_json()["error"]
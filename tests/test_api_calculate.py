@@ -0,0 +1,73 @@
+"""
+/api/v1/calculate and /api/v1/calculate:batch return the same numbers and reject non-finite ones.
+Run with `python -m pytest` from the repository root.
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+from api import ValidationError, api, validate_calculate
+
+RECORDS = [
+    {"age": age, "salary": 180000, "magi": 180000, "prior_year_fica": 160000,
+     "match_percent": 1.0, "match_cap_percent": 0.05, "hsa_coverage": "family", "total_hsa": 5000}
+    for age in (35, 50, 61, 64)
+] + [{"age": 45, "salary": 90000, "magi": 250000, "filing_status": "mfj", "backdoor_roth": 7000}]
+
+
+@pytest.fixture
+def client():
+    server = Flask(__name__)
+    server.register_blueprint(api)
+    return server.test_client()
+
+
+def flatten(result: dict, prefix: str = "") -> dict:
+    """calculate_all's nested result keyed like the batch columns (<section>_<field>)."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}_"))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def test_batch_matches_single(client):
+    response = client.post("/api/v1/calculate:batch", json={"records": RECORDS})
+    assert response.status_code == 200
+    columns = response.get_json()["columns"]
+
+    for i, record in enumerate(RECORDS):
+        response = client.post("/api/v1/calculate", json=record)
+        assert response.status_code == 200
+        single = flatten(response.get_json())
+        shared = single.keys() & columns.keys()
+        assert "k401_catchup_type" in shared
+        for name in shared:
+            assert columns[name][i] == pytest.approx(single[name]), name
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity", "1e999"])
+def test_non_finite_numbers_are_rejected(client, value):
+    body = '{"age": %s, "salary": 100000, "magi": 100000}' % value
+    response = client.post("/api/v1/calculate", data=body, content_type="application/json")
+    assert response.status_code == 400
+
+
+def test_non_finite_csv_cells_are_rejected(client):
+    body = b"age,salary,magi\n40,inf,100000\n40,100000,100000\n"
+    response = client.post("/api/v1/calculate:stream", data=body, content_type="text/csv")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.data.splitlines()]
+    assert "finite" in rows[0]["error"]
+    assert "error" not in rows[1]
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_validator_rejects_non_finite(value):
+    # What the standard library json parser hands over when orjson is not installed
+    with pytest.raises(ValidationError, match="finite"):
+        validate_calculate({"age": value, "salary": 100000, "magi": 100000})
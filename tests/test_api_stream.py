@@ -0,0 +1,101 @@
+"""
+/api/v1/calculate:stream: malformed records fail alone, not the stream.
+Run with `python -m pytest` from the repository root.
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+from api import api
+
+
+@pytest.fixture
+def client():
+    server = Flask(__name__)
+    server.register_blueprint(api)
+    return server.test_client()
+
+
+class LineStream:
+    """Request body with only read() and readline(), like gunicorn's Body (not an io object)."""
+
+    def __init__(self, body: bytes):
+        self.lines = body.splitlines(keepends=True)
+
+    def readline(self, size=None) -> bytes:
+        return self.lines.pop(0) if self.lines else b""
+
+    def read(self, size=None) -> bytes:
+        data, self.lines = b"".join(self.lines), []
+        return data
+
+
+def stream(client, body: bytes, content_type: str, raw: bool = False):
+    # raw hands the body over as a non-io stream of unknown length (chunked upload)
+    overrides = {"wsgi.input": LineStream(body), "wsgi.input_terminated": True} if raw else {}
+    response = client.post(
+        "/api/v1/calculate:stream", data=body, content_type=content_type, environ_overrides=overrides
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.data.splitlines() if line]
+
+
+def test_csv_ragged_row_fails_alone(client):
+    body = b"age,salary,magi\n35,150000,150000\n40,90000,90000,oops\n45,120000\n"
+    rows = stream(client, body, "text/csv")
+
+    assert [row["record"] for row in rows] == [1, 2, 3]
+    assert "error" not in rows[0]
+    assert rows[1]["error"] == "Too many fields"
+    # Short rows fall back to defaults for the missing cells
+    assert "magi is required" in rows[2]["error"]
+
+
+def test_csv_records_after_ragged_row_are_calculated(client):
+    body = b"age,salary,magi\n40,90000,90000,oops,more\n35,150000,150000\n"
+    rows = stream(client, body, "text/csv")
+
+    assert rows[0]["error"] == "Too many fields"
+    assert rows[1]["age"] == 35
+    assert rows[1]["salary"] == 150000
+
+
+def test_csv_byte_order_mark_header(client):
+    body = "\ufeffage,salary,magi\n35,150000,150000\n".encode("utf-8")
+    rows = stream(client, body, "text/csv")
+
+    assert len(rows) == 1
+    assert "error" not in rows[0]
+    assert rows[0]["age"] == 35
+
+
+@pytest.mark.parametrize("content_type, body", [
+    ("application/x-ndjson", b'{"age": 35, "salary": 150000, "magi": 150000}\n{"age": 50}\n'),
+    ("text/csv", b"\xef\xbb\xbfage,salary,magi\r\n35,150000,150000\r\n50,,\r\n"),
+])
+def test_non_io_request_stream(client, content_type, body):
+    rows = stream(client, body, content_type, raw=True)
+
+    assert [row["record"] for row in rows] == [1, 2]
+    assert rows[0]["age"] == 35 and "error" not in rows[0]
+    assert "salary is required" in rows[1]["error"]
+
+
+def test_ndjson_bad_records_fail_alone(client):
+    lines = [
+        {"age": 35, "salary": 150000, "magi": 150000},
+        [1, 2, 3],
+        "not json",
+        {"age": 50, "salary": 80000, "magi": 80000},
+    ]
+    body = b"\n".join(
+        line.encode() if isinstance(line, str) else json.dumps(line).encode() for line in lines
+    )
+    rows = stream(client, body, "application/x-ndjson")
+
+    assert [row["record"] for row in rows] == [1, 2, 3, 4]
+    assert "error" not in rows[0] and "error" not in rows[3]
+    assert rows[1]["error"] == "Request body must be a JSON object"
+    assert rows[2]["error"] == "Invalid JSON"
@@ -0,0 +1,36 @@
+"""
+Result cache keys and which projection calls are reused.
+Run with `python -m pytest` from the repository root.
+"""
+
+import numpy as np
+
+from cache import make_key, project_retirement_cached
+
+INPUTS = dict(
+    current_age=35, retirement_age=65, current_salary=150000, annual_raise_pct=3,
+    existing_401k=0, existing_ira=0, existing_hsa=0, match_percent=1.0, match_cap_percent=0.05,
+    match_dollar_cap=0, plan_allows_mega=False, hsa_coverage="none", total_hsa=0, monte_carlo_paths=100,
+)
+
+
+def test_equal_numbers_share_a_key():
+    assert make_key({"salary": 150000, "paths": np.int64(5), "mega": True}) == \
+        make_key({"salary": 150000.0, "paths": 5.0, "mega": np.bool_(True)})
+    assert make_key({"salary": 150000}) != make_key({"salary": "150000"})
+
+
+def test_opaque_arguments_are_not_keyed():
+    assert make_key({"returns": [0.05, 0.07]}) is None
+    assert make_key({"returns": object()}) is None
+
+
+def test_unseeded_monte_carlo_is_not_cached():
+    cache = project_retirement_cached.cache
+    bypassed = cache.bypassed
+    first = project_retirement_cached(**INPUTS)
+    assert project_retirement_cached(**INPUTS) is not first
+    assert cache.bypassed == bypassed + 2
+
+    seeded = project_retirement_cached(**INPUTS, seed=7)
+    assert project_retirement_cached(**INPUTS, seed=np.int64(7)) is seeded
@@ -0,0 +1,35 @@
+"""
+Per-period contributions: the closed forms match period-by-period compounding.
+Run with `python -m pytest` from the repository root.
+"""
+
+import numpy as np
+import pytest
+
+from projection import contribution_growth, grow_balances
+
+
+def per_period_balances(opening: float, contributions, rate: float, periods: int) -> list:
+    """Year-end balances compounding each period, with each installment paid at the period's end."""
+    q = (1 + rate) ** (1 / periods)
+    balance, balances = opening, [opening]
+    for contribution in contributions[1:]:
+        for _ in range(periods):
+            balance = balance * q + contribution / periods
+        balances.append(balance)
+    return balances
+
+
+@pytest.mark.parametrize("periods", [12, 24, 26])
+@pytest.mark.parametrize("rate", [0.0, 0.05, -0.2])
+def test_contribution_growth_matches_loop(periods, rate):
+    assert contribution_growth(1 + rate, periods) == pytest.approx(
+        per_period_balances(0.0, [0, 1.0], rate, periods)[1], rel=1e-12
+    )
+
+
+@pytest.mark.parametrize("periods", [12, 24, 26])
+def test_grow_balances_matches_loop(periods):
+    contributions = np.array([0, 23_500, 24_000, 31_000, 32_500])
+    balances = grow_balances(50_000, contributions, 0.07, periods)[0]
+    assert balances == pytest.approx(per_period_balances(50_000, contributions, 0.07, periods), rel=1e-12)
@@ -0,0 +1,26 @@
+"""
+Goal-seek solvers when real balances shrink.
+Run with `python -m pytest` from the repository root.
+"""
+
+from solver import solve_retirement_age
+
+# Saving nothing more, with inflation above the conservative return
+INPUTS = dict(
+    current_age=60, retirement_age=65, current_salary=0, annual_raise_pct=0,
+    existing_401k=1_000_000, existing_ira=0, existing_hsa=0, match_percent=0,
+    match_cap_percent=0, match_dollar_cap=0, plan_allows_mega=False,
+    hsa_coverage="none", total_hsa=0, inflation_rate=0.10,
+)
+
+
+def test_target_met_only_today_is_unreachable():
+    result = solve_retirement_age(INPUTS, 1_000_000, "conservative", real=True)
+    assert result["retirement_age"] is None
+    assert result["balance"] < 1_000_000
+
+
+def test_nominal_target_reached_after_a_year():
+    result = solve_retirement_age(INPUTS, 1_000_000, "conservative")
+    assert result["retirement_age"] == 61
+    assert result["balance"] >= 1_000_000